@@ -1,7 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from recommender_pipeline import process_resume
+from recommender_pipeline import process_resume, results_payload, sync_internship_catalog, TOP_K, MAX_K, GROUP_BY_COLUMNS
 from db_handler import add_user, get_user, get_matches_for_user, create_tables
+from models.internship_index import get_index, normalize_updates, update_index
+from models.registry import model_registry
+from utils.uploads import spool_upload, store_upload, UploadTooLarge
+from utils.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from utils.profiling import is_admin, profile_call
+from job_queue import JobQueue, job_status, run_job
+from batch_match import match_resume_texts, match_stored_resumes, texts_from_pdfs
 import os
 
 
@@ -9,20 +16,82 @@ app = Flask(__name__)
 CORS(app)  # Enable CORS so you can call the API from Postman or a web UI
 
 
-UPLOAD_FOLDER = "uploads"  # Project-root uploads for API file saves
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)  # Ensure folder exists
+# Uploads are processed from memory / a spooled temp file. Set INTERNIFY_UPLOAD_STORE
+# to a folder to also keep each PDF there under its SHA-256 (content-addressed).
+UPLOAD_STORE = os.getenv("INTERNIFY_UPLOAD_STORE") or None
+MAX_UPLOAD_BYTES = int(float(os.getenv("INTERNIFY_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+DEFAULT_HISTORY_PAGE = 50  # /matches page size
+MAX_HISTORY_PAGE = 200
+# /batch_match re-scoring more stored resumes than this (or every user) runs as a background job
+BATCH_INLINE_MAX = int(os.getenv("INTERNIFY_BATCH_INLINE_MAX", "50"))
+# Reject oversized request bodies before they are parsed (form fields add a little overhead)
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES + 64 * 1024
 
-# Ensure required tables exist at startup (idempotent)
-create_tables()
+# Background workers for asynchronous /upload_resume (INTERNIFY_JOB_WORKERS per process)
+job_queue = JobQueue(run_job)
+
+# Startup work. Skipped when multiprocessing re-imports this script as __mp_main__
+# in a helper process (the PDF page pool's forkserver/spawn workers, utils/pdf_to_text.py).
+if __name__ != "__mp_main__":
+    # Ensure required tables exist at startup (idempotent)
+    create_tables()
+
+    # Load (memory-map) the pre-built internship index once per worker process.
+    # Build it offline with: python -m models.internship_index build
+    # Mirror its catalog into the internships table so match history joins by id.
+    try:
+        sync_internship_catalog(get_index())
+    except FileNotFoundError as e:
+        print(f"⚠️ {e}")
+
+    # Unpickle the trained models once per worker (hot-reloaded when data/model_files/ changes)
+    model_registry.load_all()
+
+    job_queue.start()
+
+
+def _int_field(value, default=None):
+    """
+    Parses an integer form/query/JSON field: missing or blank → `default`.
+    Raises ValueError for anything else that is not an integer (unlike
+    Werkzeug's type=int, which silently falls back to the default).
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return int(value.strip())
+    raise ValueError(f"not an integer: {value!r}")
 
 
 @app.route("/")
 def home():
     """
     Health check endpoint.
-    Returns a simple message to confirm the API is live.
+    Returns a simple message to confirm the API is live, plus the index
+    version and the model artifact versions serving it (null = not loaded
+    or trained on another vocabulary).
+    """
+    try:
+        index = get_index()
+    except FileNotFoundError:
+        return jsonify({"message": "Internify API is running", "index": None, "models": model_registry.versions()})
+    return jsonify({
+        "message": "Internify API is running",
+        "index": index.version,
+        "models": model_registry.versions(index),
+    })
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint (text exposition format) for this worker:
+    per-stage latency histograms of the matching path, result-cache
+    outcomes, PDF pages read and the catalog size.
     """
-    return jsonify({"message": "Internify API is running"})
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
 
 @app.route("/signup", methods=["POST"])
@@ -64,7 +133,17 @@ def login():
 def upload_resume():
     """
     Accepts a PDF resume file and user_id (multipart form-data).
+    Optional fields: k (number of results, 1..MAX_K), group_by
+    ("cluster" or "company") and per_group_k (max results per group).
     Runs the ML pipeline and returns top matches.
+    With async=1 (form field or query param) the job is queued instead and
+    202 {job_id, status_url} is returned; poll GET /jobs/<job_id>.
+    With timings=1 the response adds "timings": milliseconds per pipeline stage.
+    Admins (X-Admin-Token = INTERNIFY_ADMIN_TOKEN) can add the header
+    X-Internify-Profile: 1 (or ?profile=1): the request then runs synchronously,
+    bypasses the result cache and is profiled with cProfile + tracemalloc;
+    artifacts are stored under the X-Request-ID (or a generated id) and the
+    response adds "profile" with the top functions and allocation sites.
     """
     user_id = request.form.get("user_id")
     file = request.files.get("file")
@@ -72,39 +151,223 @@ def upload_resume():
     if not user_id or not file:
         return jsonify({"error": "Missing user_id or file"}), 400
 
-    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(file_path)
+    try:
+        k = _int_field(request.form.get("k"), TOP_K)
+    except ValueError:
+        k = None
+    try:
+        per_group_k = _int_field(request.form.get("per_group_k"), 1)
+    except ValueError:
+        per_group_k = None
+    group_by = request.form.get("group_by") or None
+    if k is None or not 1 <= k <= MAX_K:
+        return jsonify({"error": f"k must be an integer between 1 and {MAX_K}"}), 400
+    if group_by is not None and group_by not in GROUP_BY_COLUMNS:
+        return jsonify({"error": f"group_by must be one of {list(GROUP_BY_COLUMNS)}"}), 400
+    if per_group_k is None or per_group_k < 1:
+        return jsonify({"error": "per_group_k must be a positive integer"}), 400
+
+    profile = (request.headers.get("X-Internify-Profile") or request.args.get("profile") or "").lower() \
+        in ("1", "true", "yes")
+    if profile and not is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "Profiling requires a valid X-Admin-Token"}), 403
+
+    try:
+        stream, _, digest = spool_upload(file.stream, MAX_UPLOAD_BYTES)
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    if UPLOAD_STORE:
+        store_upload(stream, digest, UPLOAD_STORE)
+
+    run_async = (request.form.get("async") or request.args.get("async") or "").lower() in ("1", "true", "yes")
+    timings = (request.form.get("timings") or request.args.get("timings") or "").lower() in ("1", "true", "yes")
+    try:
+        if profile:
+            results_df, summary = profile_call(
+                process_resume, stream, int(user_id), k=k, group_by=group_by, per_group_k=per_group_k,
+                use_cache=False, digest=digest, request_id=request.headers.get("X-Request-ID"))
+            payload = results_payload(results_df, timings=timings)
+            payload["profile"] = summary
+            return jsonify(payload)
+        if run_async:
+            params = {"k": k, "group_by": group_by, "per_group_k": per_group_k, "digest": digest}
+            job_id = job_queue.submit(int(user_id), stream.read(), params)
+            return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+        results_df = process_resume(stream, int(user_id), k=k, group_by=group_by, per_group_k=per_group_k,
+                                    digest=digest)
+        return jsonify(results_payload(results_df, timings=timings))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
+@app.route("/batch_match", methods=["POST"])
+def batch_match():
+    """
+    Scores many resumes in one call (resumes × internships sparse product).
+    Admin only (X-Admin-Token = INTERNIFY_ADMIN_TOKEN).
+    - JSON {"user_ids": [...], "k": 5}: re-matches each user's latest stored
+      resume; omit user_ids to re-match every user. More than
+      INTERNIFY_BATCH_INLINE_MAX users (or every user, or async=1) are queued
+      as a background job: 202 {job_id, status_url}, poll GET /jobs/<job_id>.
+    - multipart form-data: files=<pdf> (repeated) with user_ids=<id> (repeated,
+      same order), optional k. Bounded by the request size limit; runs inline.
+    Response: {"processed": n, "runs": [{user_id, run_id}]}.
+    """
+    if not is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "Batch matching requires a valid X-Admin-Token"}), 403
+    if request.files:
+        files = request.files.getlist("files")
+        user_ids = request.form.getlist("user_ids")
+        k = request.form.get("k")
+        if not files or len(files) != len(user_ids):
+            return jsonify({"error": "Provide one user_ids value per uploaded file"}), 400
+    else:
+        body = request.get_json(silent=True) or {}
+        user_ids = body.get("user_ids")
+        k = body.get("k")
+        files = None
+        if user_ids is not None and not isinstance(user_ids, list):
+            return jsonify({"error": "user_ids must be a list of integers"}), 400
+    try:
+        k = _int_field(k, TOP_K)
+    except ValueError:
+        k = None
+    if k is None or not 1 <= k <= MAX_K:
+        return jsonify({"error": f"k must be an integer between 1 and {MAX_K}"}), 400
+    try:
+        user_ids = [_int_field(user_id) for user_id in user_ids] if user_ids is not None else None
+        if user_ids is not None and None in user_ids:
+            raise ValueError("blank user id")
+    except ValueError:
+        return jsonify({"error": "user_ids must be a list of integers"}), 400
+
+    run_async = (request.form.get("async") or request.args.get("async") or "").lower() in ("1", "true", "yes")
+    if files is None and (run_async or user_ids is None or len(user_ids) > BATCH_INLINE_MAX):
+        job_id = job_queue.submit(None, b"", {"job": "batch_match", "user_ids": user_ids, "k": k})
+        return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+    try:
+        if files is None:
+            runs = match_stored_resumes(user_ids, k=k)
+        else:
+            sources = []
+            for user_id, file in zip(user_ids, files):
+                stream, _, _ = spool_upload(file.stream, MAX_UPLOAD_BYTES)
+                sources.append((user_id, stream))
+            runs = match_resume_texts(texts_from_pdfs(sources), k=k)
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "processed": len(runs),
+        "runs": [{"user_id": r["user_id"], "run_id": r["run_id"]} for r in runs],
+    })
+
+
+@app.route("/internships", methods=["POST"])
+def ingest_internships():
+    """
+    Incremental catalog ingestion (JSON), admin only (X-Admin-Token = INTERNIFY_ADMIN_TOKEN):
+    {"upsert": [{"id": 7, "company": ..., "title": ..., "description": ...,
+                 "required_skills": "python, sql", "link": ...}],
+     "retire": [12, 40]}
+    Only the upserted rows are vectorized; the new index version is live in
+    this worker at once and in other workers within INTERNIFY_INDEX_POLL seconds.
+    Nothing is refitted or trained here: once IDF drift passes INTERNIFY_IDF_DRIFT
+    the response reports refit_needed (run `python -m models.internship_index refit`
+    and `python -m models.train` offline).
+    Response: {version, n_docs, upserted, retired, idf_drift, refit_needed}.
+    """
+    if not is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "Catalog updates require a valid X-Admin-Token"}), 403
+    body = request.get_json(silent=True) or {}
+    upserts = body.get("upsert") or []
+    retire = body.get("retire") or []
+    if not isinstance(upserts, list) or not isinstance(retire, list) or not (upserts or retire):
+        return jsonify({"error": "Provide an 'upsert' list of internships and/or a 'retire' list of ids"}), 400
+    try:
+        upserts, retire = normalize_updates(upserts, retire)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     try:
-        results_df = process_resume(file_path, int(user_id))
-        return jsonify({
-            "message": "Resume processed successfully",
-            "results": results_df.to_dict(orient="records")
-        })
+        index = update_index(upserts, retire)
+        changed_ids = upserts["internship_id"].tolist() if upserts is not None else []
+        sync_internship_catalog(index, internship_ids=changed_ids)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    change = index.meta["last_update"]
+    return jsonify({
+        "version": index.version,
+        "n_docs": index.meta["n_docs"],
+        "upserted": change["upserted"],
+        "retired": change["retired"],
+        "idf_drift": change["idf_drift"],
+        "refit_needed": change["refit_needed"],
+    })
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job(job_id):
+    """
+    Returns the status of an asynchronous /upload_resume job:
+    {job_id, status (queued/running/done/failed), timestamps, result or error}.
+    """
+    status = job_status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(status)
 
 
 @app.route("/matches", methods=["GET"])
 def matches():
     """
-    Returns saved matches for a given user_id.
-    Response is a JSON list of {company, title, final_score, cluster}.
+    Returns saved matches for a given user_id, best score first, one page at a time.
+    Query params: user_id, limit (1..MAX_HISTORY_PAGE, default 50) and cursor
+    (the next_cursor value of the previous page).
+    Response: {"matches": [{company, title, final_score, cluster, link, run_id, created_at}],
+               "next_cursor": str or null}.
     """
     user_id = request.args.get("user_id")
     if not user_id:
         return jsonify({"error": "Missing user_id"}), 400
     try:
-        rows = get_matches_for_user(int(user_id))
+        limit = _int_field(request.args.get("limit"), DEFAULT_HISTORY_PAGE)
+    except ValueError:
+        limit = None
+    if limit is None or not 1 <= limit <= MAX_HISTORY_PAGE:
+        return jsonify({"error": f"limit must be an integer between 1 and {MAX_HISTORY_PAGE}"}), 400
+    after = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            score, match_id = cursor.split(":", 1)
+            after = (float(score), int(match_id))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    try:
+        rows = get_matches_for_user(int(user_id), limit=limit, after=after)
         payload = [
-            {"company": r[0], "title": r[1], "final_score": float(r[2]), "cluster": int(r[3])}
+            {"company": r[0], "title": r[1], "final_score": float(r[2]), "cluster": int(r[3]),
+             "link": r[4], "run_id": r[5], "created_at": r[6]}
             for r in rows
         ]
-        return jsonify(payload)
+        next_cursor = f"{rows[-1][2]!r}:{rows[-1][7]}" if len(rows) == limit else None
+        return jsonify({"matches": payload, "next_cursor": next_cursor})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.errorhandler(413)
+def upload_too_large(_error):
+    """
+    JSON error for request bodies over MAX_CONTENT_LENGTH.
+    """
+    return jsonify({"error": f"Upload exceeds {MAX_UPLOAD_BYTES} bytes"}), 413
+
+
 if __name__ == "__main__":
     # Start Flask development server
     app.run(debug=True, use_reloader=False)
@@ -0,0 +1,147 @@
+import argparse
+import io
+import itertools
+import os
+import re
+import time
+
+import numpy as np
+
+from models.internship_index import get_index
+from recommender_pipeline import (
+    load_models, precomputed_signals, KEEP_MATCH_HISTORY, NO_CLUSTER, SCORE_WEIGHTS, TOP_K,
+)
+from utils.pdf_to_text import extract_pdf
+from utils.resume_parser import extract_skills
+from utils.topk import top_k_rows
+from db_handler import create_tables, iter_latest_resumes, save_matches_bulk
+
+# Resumes scored per chunk. Peak memory is ~chunk_size × catalog size
+# float32 score matrices, independent of how many resumes are matched.
+BATCH_CHUNK_SIZE = int(os.getenv("INTERNIFY_BATCH_CHUNK", "64"))
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def match_resume_texts(items, k=TOP_K, chunk_size=BATCH_CHUNK_SIZE, save=True, index=None):
+    """
+    Scores many resumes against the whole catalog.
+    items: iterable of (user_id, resume_text); consumed lazily, chunk by chunk.
+    Per chunk: one transform for all resumes, one sparse × dense product
+    for the resumes × internships similarities, one for skill overlap, a
+    row-wise argpartition top-K, and one DB transaction for all runs.
+    Resume-independent terms (logistic probabilities) come precomputed
+    from the index, or are predicted once per batch for a stale index.
+    Returns a list of {user_id, run_id, internship_ids, scores, clusters}.
+    """
+    index = index or get_index()
+    catalog_ids = index.catalog["internship_id"].to_numpy()
+    _, log_model, kmeans_model = load_models(index)
+    logistic, labels = precomputed_signals(index)
+    if logistic is None and log_model is not None:
+        logistic = log_model.predict(index.matrix).astype(np.float32)
+    base_scores = np.zeros(len(index), dtype=np.float32)
+    if logistic is not None:
+        base_scores += np.float32(SCORE_WEIGHTS["logistic"]) * logistic
+    skill_counts = np.maximum(index.skills.counts, 1).astype(np.float32)
+
+    summary = []
+    for chunk in _chunks(items, chunk_size):
+        user_ids = [user_id for user_id, _ in chunk]
+        texts = [text or "" for _, text in chunk]
+
+        # Resumes × internships cosine similarity: (n × d) · (d × c) → (n × c).
+        # Sparse × sparse; only the n × c result is densified, never d × c.
+        resume_vectors = index.transform(texts)
+        similarity = index.matrix.dot(resume_vectors.T).T.toarray().astype(np.float32)
+
+        # Skill overlap fraction per (resume, internship)
+        skill_rows = np.vstack([index.skills.vector(extract_skills(t)) for t in texts])
+        overlap = np.asarray(index.skills.matrix.dot(skill_rows.T)).T / skill_counts
+
+        scores = (
+            np.float32(SCORE_WEIGHTS["similarity"]) * similarity
+            + base_scores
+            + np.float32(SCORE_WEIGHTS["skills"]) * overlap
+        )
+        top = top_k_rows(scores, k)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        # Cluster ids: built into the index, else predicted for this chunk's winners only
+        if labels is not None:
+            clusters = labels
+        else:
+            winners = np.unique(top)
+            clusters = np.full(len(index), NO_CLUSTER, dtype=int)
+            if kmeans_model is not None and winners.size:
+                clusters[winners] = kmeans_model.predict(index.matrix[winners])
+
+        runs = [
+            (user_id, list(zip(catalog_ids[row].tolist(), row_scores.astype(float).tolist(), clusters[row].tolist())))
+            for user_id, row, row_scores in zip(user_ids, top, top_scores)
+        ]
+        run_ids = save_matches_bulk(runs, replace=not KEEP_MATCH_HISTORY) if save else [None] * len(runs)
+        for (user_id, rows), run_id in zip(runs, run_ids):
+            summary.append({
+                "user_id": user_id,
+                "run_id": run_id,
+                "internship_ids": [r[0] for r in rows],
+                "scores": [r[1] for r in rows],
+                "clusters": [r[2] for r in rows],
+            })
+    return summary
+
+
+def match_stored_resumes(user_ids=None, **options):
+    """
+    Re-matches each user's most recent stored resume (resumes table).
+    """
+    return match_resume_texts(iter_latest_resumes(user_ids), **options)
+
+
+def texts_from_pdfs(sources):
+    """
+    Yields (user_id, text) for (user_id, pdf path/bytes/stream) pairs.
+    """
+    for user_id, source in sources:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        yield user_id, extract_pdf(source).text
+
+
+def pdf_dir_sources(folder):
+    """
+    Yields (user_id, path) for PDFs named "<user_id>[_anything].pdf".
+    """
+    for name in sorted(os.listdir(folder)):
+        match = re.match(r"^(\d+)", name)
+        if match and name.lower().endswith(".pdf"):
+            yield int(match.group(1)), os.path.join(folder, name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch re-match resumes against the current catalog.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-db", action="store_true", help="latest stored resume of every user")
+    source.add_argument("--pdf-dir", help="folder of <user_id>*.pdf files")
+    parser.add_argument("--user-ids", type=int, nargs="*", help="limit --from-db to these users")
+    parser.add_argument("--k", type=int, default=TOP_K)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="score without writing matches")
+    args = parser.parse_args()
+
+    create_tables()
+    started = time.perf_counter()
+    options = {"k": args.k, "chunk_size": args.chunk_size, "save": not args.dry_run}
+    if args.from_db:
+        results = match_stored_resumes(args.user_ids, **options)
+    else:
+        results = match_resume_texts(texts_from_pdfs(pdf_dir_sources(args.pdf_dir)), **options)
+    print(f"✅ Matched {len(results)} resume(s) in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,451 @@
+# ------------------------------------------------------------
+# pipeline_bench.py
+# Reproducible benchmark of the matching path. Per catalog size
+# (default 1k, 10k, 100k and 1M synthetic internships):
+# - build: synthetic catalog → index, then the KMeans / logistic
+#   models are trained: wall times, index size on disk, peak RSS.
+# - pipeline: process_resume over synthetic resume PDFs, cold (cache
+#   off) and cached: per-stage latency from the pipeline's own stage
+#   timer, throughput, peak RSS.
+# - endpoints: the Flask app in its own process under concurrent
+#   POST /upload_resume and GET /matches load: latency, requests/s,
+#   errors, server peak RSS.
+# Every phase runs in a freshly spawned process inside a scratch
+# working dir, so peak RSS is per phase and the real data/ and
+# database/ are never touched. Seeds are fixed; results are one JSON
+# document with sorted keys, meant to be kept per commit and diffed:
+#
+#   python -m benchmarks.pipeline_bench run --sizes 1000 10000 --out base.json
+#   python -m benchmarks.pipeline_bench compare base.json head.json
+# ------------------------------------------------------------
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog, synthetic_labels, synthetic_resume_pdf
+
+SCHEMA_VERSION = 1
+SIZES = (1000, 10000, 100000, 1000000)
+PHASES = ("build", "pipeline", "endpoints")
+N_RESUMES = 20               # distinct synthetic resumes per run
+RESUME_PAGES = 2
+WARMUP_REQUESTS = 3          # untimed requests before each measurement
+CONCURRENCY = 8              # concurrent clients in the endpoint phase
+ENDPOINT_REQUESTS = 200      # requests per endpoint
+SERVER_START_TIMEOUT = 1800  # seconds; the app syncs the catalog into SQLite at start
+REGRESSION_THRESHOLD = 0.10  # compare: relative change reported as a regression
+RESULTS_DIR = "benchmarks/results"
+LABELS_PATH = "data/training/match_labels.csv"
+
+
+def run_benchmarks(sizes=SIZES, phases=PHASES, n_resumes=N_RESUMES, resume_pages=RESUME_PAGES,
+                   concurrency=CONCURRENCY, n_requests=ENDPOINT_REQUESTS, seed=0, workdir=None):
+    """
+    Runs the selected phases for every catalog size and returns the
+    results document (see the header). `workdir` keeps the scratch
+    catalogs, indexes and databases; by default a temp dir is removed.
+    """
+    root = workdir or tempfile.mkdtemp(prefix="internify-bench-")
+    try:
+        resume_paths = _write_resumes(os.path.join(root, "resumes"), n_resumes, resume_pages, seed)
+        scenarios = []
+        for n in sizes:
+            path = os.path.abspath(os.path.join(root, "catalog-%d" % n))
+            print("… %d internships" % n, file=sys.stderr)
+            scenario = {"n_internships": n, "build": _in_process(_build_phase, path, n, seed)}
+            if "pipeline" in phases:
+                scenario["pipeline"] = _in_process(_pipeline_phase, path, resume_paths)
+            if "endpoints" in phases:
+                scenario["endpoints"] = _endpoint_phase(path, resume_paths, concurrency, n_requests)
+            scenarios.append(scenario)
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return {
+        "schema": SCHEMA_VERSION,
+        "environment": _environment(),
+        "config": {
+            "sizes": list(sizes), "phases": list(phases), "n_resumes": n_resumes, "resume_pages": resume_pages,
+            "concurrency": concurrency, "endpoint_requests": n_requests, "seed": seed,
+            "warmup_requests": WARMUP_REQUESTS,
+        },
+        "scenarios": scenarios,
+    }
+
+
+# ------------------------------------------------------------
+# Phases (each runs in a spawned process; see _in_process)
+# ------------------------------------------------------------
+def _build_phase(workdir, n, seed):
+    _enter(workdir)
+    from models.internship_index import INDEX_DIR, build_index, read_current, refresh_signals
+    from models.registry import model_registry
+    from models.train import train_kmeans, train_logistic
+    from utils.catalog import CATALOG_PATH
+
+    started = time.perf_counter()
+    catalog = synthetic_catalog(n, seed)
+    os.makedirs(os.path.dirname(LABELS_PATH), exist_ok=True)
+    catalog.to_csv(CATALOG_PATH, index=False)
+    synthetic_labels(catalog).to_csv(LABELS_PATH, index=False)
+    del catalog
+    generate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = build_index()
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    train_kmeans(index)
+    train_logistic(index, LABELS_PATH)
+    model_registry.load_all()  # pick up the new artifacts now, not after the poll interval
+    index = refresh_signals()
+    train_s = time.perf_counter() - started
+    return {
+        "generate_s": round(generate_s, 3),
+        "build_s": round(build_s, 3),
+        "train_s": round(train_s, 3),
+        "n_features": int(index.matrix.shape[1]),
+        "nnz": int(index.matrix.nnz),
+        "index_mb": _dir_mb(os.path.join(INDEX_DIR, read_current())),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _pipeline_phase(workdir, resume_paths):
+    _enter(workdir)
+    from db_handler import add_user, create_tables
+    from recommender_pipeline import process_resume
+
+    create_tables()
+    for i in range(len(resume_paths)):
+        add_user("bench %d" % i, "bench%d@example.com" % i, "bench")
+    pdfs = [_read(p) for p in resume_paths]
+    for data in pdfs[:WARMUP_REQUESTS]:
+        process_resume(data, 1, use_cache=False)
+    cold = _time_pipeline(process_resume, pdfs, use_cache=False)
+    _time_pipeline(process_resume, pdfs, use_cache=True)  # fill the result cache
+    cached = _time_pipeline(process_resume, pdfs, use_cache=True)
+    return {"cold": cold, "cached": cached, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _time_pipeline(process_resume, pdfs, use_cache):
+    stages = {}
+    started = time.perf_counter()
+    for user_id, data in enumerate(pdfs, 1):
+        results = process_resume(data, user_id, use_cache=use_cache)
+        for stage, ms in results.attrs["timings"].items():
+            stages.setdefault(stage, []).append(ms)
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(pdfs),
+        "throughput_rps": round(len(pdfs) / elapsed, 3),
+        "stages": {stage: _summary(values) for stage, values in stages.items()},
+    }
+
+
+def _serve(workdir, port_queue):
+    _enter(workdir)
+    os.environ["INTERNIFY_JOB_WORKERS"] = "0"  # synchronous uploads only
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no access log per request
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def _endpoint_phase(workdir, resume_paths, concurrency, n_requests):
+    """
+    Starts the app in its own process and drives it from this one, so
+    client threads do not share the server's interpreter.
+    """
+    context = multiprocessing.get_context("spawn")
+    port_queue = context.Queue()
+    server = context.Process(target=_serve, args=(workdir, port_queue), daemon=True)
+    server.start()
+    try:
+        base_url = "http://127.0.0.1:%d" % port_queue.get(timeout=SERVER_START_TIMEOUT)
+        user_ids = []
+        for i in range(len(resume_paths)):
+            _request(base_url + "/signup", json.dumps({
+                "name": "load %d" % i, "email": "load%d@example.com" % i, "password": "bench"}).encode(),
+                "application/json")
+            status, body = _request(base_url + "/login", json.dumps({
+                "email": "load%d@example.com" % i, "password": "bench"}).encode(), "application/json")
+            user_ids.append(json.loads(body)["user_id"])
+        pdfs = [_read(p) for p in resume_paths]
+
+        def upload(i):
+            body, content_type = _multipart({"user_id": str(user_ids[i % len(pdfs)])},
+                                            {"file": ("resume.pdf", pdfs[i % len(pdfs)])})
+            return _request(base_url + "/upload_resume", body, content_type)
+
+        def history(i):
+            return _request(base_url + "/matches?user_id=%d" % user_ids[i % len(user_ids)])
+
+        for i in range(WARMUP_REQUESTS):
+            upload(i)
+        results = {
+            "upload_resume": _load(upload, n_requests, concurrency),
+            "matches": _load(history, n_requests, concurrency),
+        }
+        results["server_peak_rss_mb"] = _process_peak_rss_mb(server.pid)
+        return results
+    finally:
+        server.terminate()
+        server.join()
+
+
+def _load(send, n_requests, concurrency):
+    def timed(i):
+        started = time.perf_counter()
+        status, _ = send(i)
+        return status, (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, range(n_requests)))
+    elapsed = time.perf_counter() - started
+    latencies = [ms for status, ms in outcomes if status == 200]
+    summary = _summary(latencies) if latencies else {}
+    summary.update({
+        "requests": n_requests,
+        "errors": sum(1 for status, _ in outcomes if status != 200),
+        "throughput_rps": round(n_requests / elapsed, 3),
+    })
+    return summary
+
+
+# ------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------
+def _in_process(func, *args):
+    """
+    Runs func(*args) in a fresh spawned interpreter and returns its result.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def _enter(workdir):
+    # The app's data/, database/ and model paths are relative to the working dir
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+
+def _write_resumes(folder, n_resumes, n_pages, seed):
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(n_resumes):
+        path = os.path.abspath(os.path.join(folder, "resume-%03d.pdf" % i))
+        with open(path, "wb") as f:
+            f.write(synthetic_resume_pdf(seed * 100003 + i, n_pages))
+        paths.append(path)
+    return paths
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _request(url, data=None, content_type=None):
+    request = urllib.request.Request(url, data=data)
+    if content_type:
+        request.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(('--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n%s\r\n'
+                      % (boundary, name, value)).encode())
+    for name, (filename, data) in files.items():
+        parts.append(('--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\n'
+                      'Content-Type: application/pdf\r\n\r\n' % (boundary, name, filename)).encode())
+        parts.append(data + b"\r\n")
+    parts.append(("--%s--\r\n" % boundary).encode())
+    return b"".join(parts), "multipart/form-data; boundary=%s" % boundary
+
+
+def _summary(values_ms):
+    values = np.asarray(values_ms, dtype=np.float64)
+    return {
+        "count": int(values.shape[0]),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+
+
+def _process_peak_rss_mb(pid):
+    try:
+        with open("/proc/%d/status" % pid) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _dir_mb(path):
+    total = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return round(total / (1024.0 * 1024.0), 3)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import pandas
+    import sklearn
+    return {
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "scikit_learn": sklearn.__version__,
+        "settings": {k: v for k, v in sorted(os.environ.items()) if k.startswith("INTERNIFY_")},
+    }
+
+
+# ------------------------------------------------------------
+# Comparing two result files
+# ------------------------------------------------------------
+def flatten(results):
+    """
+    {"<n_internships>/<phase>/.../<metric>": value} for every numeric
+    timing, throughput and memory metric of a results document.
+    """
+    flat = {}
+
+    def walk(prefix, node):
+        for key, value in node.items():
+            name = "%s/%s" % (prefix, key)
+            if isinstance(value, dict):
+                walk(name, value)
+            elif isinstance(value, (int, float)) and key.endswith(("_ms", "_s", "_mb", "_rps")):
+                flat[name] = value
+
+    for scenario in results["scenarios"]:
+        walk(str(scenario["n_internships"]), {k: v for k, v in scenario.items() if k != "n_internships"})
+    return flat
+
+
+def compare(base, head, threshold=REGRESSION_THRESHOLD):
+    """
+    Rows {metric, base, head, change, regression} for metrics present in
+    both documents. `change` is relative; throughput regresses when it
+    drops by more than `threshold`, everything else when it grows.
+    """
+    base_flat, head_flat = flatten(base), flatten(head)
+    rows = []
+    for metric in sorted(set(base_flat) & set(head_flat)):
+        old, new = base_flat[metric], head_flat[metric]
+        change = (new - old) / old if old else 0.0
+        worse = -change if metric.endswith("_rps") else change
+        rows.append({"metric": metric, "base": old, "head": new, "change": round(change, 4),
+                     "regression": worse > threshold})
+    return rows
+
+
+def _print_summary(results):
+    print("%-9s %-9s %-9s %-9s %-11s %-11s %-10s %-10s" % (
+        "catalog", "build s", "index MB", "RSS MB", "cold p50ms", "cold p95ms", "cold rps", "upload p95"))
+    for scenario in results["scenarios"]:
+        build = scenario["build"]
+        cold = scenario.get("pipeline", {}).get("cold", {})
+        total = cold.get("stages", {}).get("total", {})
+        upload = scenario.get("endpoints", {}).get("upload_resume", {})
+        print("%-9d %-9.2f %-9.1f %-9s %-11s %-11s %-10s %-10s" % (
+            scenario["n_internships"], build["build_s"], build["index_mb"],
+            scenario.get("pipeline", {}).get("peak_rss_mb", "-"), total.get("p50_ms", "-"),
+            total.get("p95_ms", "-"), cold.get("throughput_rps", "-"), upload.get("p95_ms", "-")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Internify matching path on synthetic data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="Run the benchmark and write a results JSON")
+    run_cmd.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    run_cmd.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES),
+                         help="build always runs; pipeline / endpoints are optional")
+    run_cmd.add_argument("--resumes", type=int, default=N_RESUMES)
+    run_cmd.add_argument("--pages", type=int, default=RESUME_PAGES, help="pages per synthetic resume")
+    run_cmd.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    run_cmd.add_argument("--requests", type=int, default=ENDPOINT_REQUESTS, help="requests per endpoint")
+    run_cmd.add_argument("--seed", type=int, default=0)
+    run_cmd.add_argument("--workdir", default=None, help="keep scratch data here instead of a temp dir")
+    run_cmd.add_argument("--out", default=None, help="default: %s/<commit>.json" % RESULTS_DIR)
+    compare_cmd = sub.add_parser("compare", help="Diff two results files")
+    compare_cmd.add_argument("base")
+    compare_cmd.add_argument("head")
+    compare_cmd.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    compare_cmd.add_argument("--fail", action="store_true", help="exit 1 when a metric regressed")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args.sizes, args.phases, args.resumes, args.pages, args.concurrency,
+                                 args.requests, args.seed, args.workdir)
+        out = args.out or os.path.join(RESULTS_DIR, "%s.json" % ((results["environment"]["git_commit"] or "local")[:12]))
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        _print_summary(results)
+        print("✅ Wrote %s" % out)
+    else:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.head, encoding="utf-8") as f:
+            head = json.load(f)
+        rows = compare(base, head, args.threshold)
+        print("%-60s %12s %12s %9s" % ("metric", "base", "head", "change"))
+        for row in rows:
+            print("%-60s %12.3f %12.3f %+8.1f%%%s" % (
+                row["metric"], row["base"], row["head"], row["change"] * 100, "  ⚠️" if row["regression"] else ""))
+        regressions = sum(row["regression"] for row in rows)
+        print("%d metrics compared, %d regressed by more than %.0f%%" % (len(rows), regressions, args.threshold * 100))
+        sys.exit(1 if args.fail and regressions else 0)
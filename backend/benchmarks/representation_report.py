@@ -0,0 +1,157 @@
+# ------------------------------------------------------------
+# representation_report.py
+# Memory size vs. ranking quality of the TF-IDF representations
+# (models/text_vectorizer.py) against the original setup: float64,
+# unlimited vocabulary, unigrams.
+# - Evaluation set: a synthetic catalog (or --catalog) and queries made
+#   of random halves of catalog descriptions, both from a fixed seed.
+# - Memory: CSR arrays (data + indices + indptr), the vocabulary dict
+#   (approximate Python object size; none in hashing mode) and IDF.
+# - Quality: recall@k and NDCG@k of each representation's cosine
+#   top-k against the baseline's, with the baseline cosine as graded
+#   relevance. Only the TF-IDF term of the blend is compared; the
+#   logistic and skill terms do not depend on the representation.
+#
+#   python -m benchmarks.representation_report --size 20000
+#   python -m benchmarks.representation_report --catalog data/internships.csv --json
+# ------------------------------------------------------------
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog
+from models.text_vectorizer import make_vectorizer
+from utils.catalog import load_catalog
+from utils.topk import top_k
+
+BASELINE = "float64"
+# name → vectorizer params (see make_vectorizer); BASELINE is the pre-compact setup
+CONFIGS = {
+    "float64": {"stop_words": "english", "dtype": "float64"},
+    "float32": {"stop_words": "english", "dtype": "float32"},
+    "float32-min_df2": {"stop_words": "english", "dtype": "float32", "min_df": 2},
+    "float32-min_df5": {"stop_words": "english", "dtype": "float32", "min_df": 5},
+    "float32-max10k": {"stop_words": "english", "dtype": "float32", "max_features": 10000},
+    "hashing-2^18": {"stop_words": "english", "dtype": "float32", "hashing_features": 2 ** 18},
+    "hashing-2^16": {"stop_words": "english", "dtype": "float32", "hashing_features": 2 ** 16},
+}
+EVAL_SIZE = 20000
+EVAL_QUERIES = 200
+EVAL_K = 10
+
+
+def evaluation_set(catalog_texts, n_queries=EVAL_QUERIES, seed=0):
+    """
+    Fixed query texts: random halves of `n_queries` catalog descriptions.
+    """
+    rng = np.random.default_rng(seed)
+    queries = []
+    for row in rng.choice(len(catalog_texts), size=min(n_queries, len(catalog_texts)), replace=False):
+        words = catalog_texts[int(row)].split()
+        keep = rng.random(len(words)) < 0.5
+        queries.append(" ".join(w for w, kept in zip(words, keep) if kept) or " ".join(words))
+    return queries
+
+
+def representation_report(catalog_texts, queries, configs=None, k=EVAL_K, baseline=BASELINE):
+    """
+    Builds every representation over `catalog_texts`, scores `queries`
+    and returns one dict per config: memory sizes (MB), build time,
+    query latency and recall@k / NDCG@k against `baseline`.
+    """
+    configs = dict(configs or CONFIGS)
+    configs.setdefault(baseline, CONFIGS[baseline])
+    names = [baseline] + [name for name in configs if name != baseline]
+    reference = None
+    rows = []
+    for name in names:
+        vectorizer = make_vectorizer(configs[name])
+        started = time.perf_counter()
+        matrix = vectorizer.fit_transform(catalog_texts).tocsr()
+        build_s = time.perf_counter() - started
+        if hasattr(vectorizer, "stop_words_"):
+            del vectorizer.stop_words_
+
+        started = time.perf_counter()
+        scores = [matrix.dot(vectorizer.transform([q]).T).toarray().ravel() for q in queries]
+        query_ms = (time.perf_counter() - started) * 1000.0 / max(len(queries), 1)
+        top = [top_k(s, k) for s in scores]
+        if reference is None:
+            reference = (scores, top)
+
+        row = {
+            "config": name,
+            "params": configs[name],
+            "n_features": int(matrix.shape[1]),
+            "nnz": int(matrix.nnz),
+            "matrix_mb": _mb(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes),
+            "vocabulary_mb": _mb(_dict_bytes(vectorizer.vocabulary_)),
+            "idf_mb": _mb(np.asarray(vectorizer.idf_).nbytes),
+            "build_s": round(build_s, 3),
+            "query_ms": round(query_ms, 3),
+        }
+        row["total_mb"] = round(row["matrix_mb"] + row["vocabulary_mb"] + row["idf_mb"], 3)
+        row.update(_quality(reference, top, k))
+        rows.append(row)
+    base_mb = rows[0]["total_mb"]
+    for row in rows:
+        row["memory_vs_baseline"] = round(row["total_mb"] / base_mb, 4) if base_mb else None
+    return rows
+
+
+def _quality(reference, top, k):
+    ref_scores, ref_top = reference
+    recall, ndcg = [], []
+    for scores, expected, found in zip(ref_scores, ref_top, top):
+        expected_set = set(expected.tolist())
+        recall.append(len(expected_set.intersection(found.tolist())) / max(len(expected_set), 1))
+        discounts = 1.0 / np.log2(np.arange(2, k + 2))
+        ideal = float((scores[expected] * discounts[:len(expected)]).sum())
+        actual = float((scores[found] * discounts[:len(found)]).sum())
+        ndcg.append(actual / ideal if ideal > 0 else 1.0)
+    return {"recall_at_k": round(float(np.mean(recall)), 4), "ndcg_at_k": round(float(np.mean(ndcg)), 4)}
+
+
+def _dict_bytes(vocabulary):
+    if not vocabulary:
+        return 0
+    return sys.getsizeof(vocabulary) + sum(sys.getsizeof(t) + sys.getsizeof(i) for t, i in vocabulary.items())
+
+
+def _mb(n_bytes):
+    return round(n_bytes / (1024.0 * 1024.0), 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory vs. ranking quality of TF-IDF representations.")
+    parser.add_argument("--catalog", default=None, help="CSV or .arrow catalog (default: synthetic)")
+    parser.add_argument("--size", type=int, default=EVAL_SIZE, help="synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=EVAL_QUERIES)
+    parser.add_argument("--k", type=int, default=EVAL_K)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    if args.catalog:
+        texts = load_catalog(args.catalog)["description"].astype(str).tolist()
+    else:
+        texts = synthetic_catalog(args.size, args.seed)["description"].tolist()
+    report = representation_report(texts, evaluation_set(texts, args.queries, args.seed),
+                                   {name: CONFIGS[name] for name in args.configs}, args.k)
+    if args.json:
+        print(json.dumps({"n_docs": len(texts), "queries": args.queries, "k": args.k, "seed": args.seed,
+                          "baseline": BASELINE, "rows": report}, indent=2, sort_keys=True))
+        sys.exit(0)
+    print("%d docs, %d queries, baseline %s" % (len(texts), args.queries, BASELINE))
+    print("%-16s %-9s %-10s %-9s %-9s %-8s %-10s %-9s %-9s" % (
+        "config", "features", "matrix MB", "vocab MB", "total MB", "× base", "recall@%d" % args.k,
+        "ndcg@%d" % args.k, "query ms"))
+    for row in report:
+        print("%-16s %-9d %-10.2f %-9.2f %-9.2f %-8.3f %-10.4f %-9.4f %-9.3f" % (
+            row["config"], row["n_features"], row["matrix_mb"], row["vocabulary_mb"], row["total_mb"],
+            row["memory_vs_baseline"], row["recall_at_k"], row["ndcg_at_k"], row["query_ms"]))
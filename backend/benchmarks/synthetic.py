@@ -0,0 +1,110 @@
+# ------------------------------------------------------------
+# synthetic.py
+# Deterministic synthetic data for the benchmarks.
+# - synthetic_catalog: n internships whose descriptions draw from a
+#   Zipf-distributed pseudo-word vocabulary (a long tail of rare
+#   tokens, like real postings) plus taxonomy skills.
+# - synthetic_resume_pdf: a resume PDF (PyMuPDF) listing skills and
+#   project text drawn from the same vocabulary.
+# The same seed always produces the same catalog and resumes, so
+# results from different commits are comparable.
+# ------------------------------------------------------------
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.pdf_to_text import _import_pymupdf
+from utils.skill_matcher import DEFAULT_SKILLS
+
+N_WORDS = 20000            # pseudo-word vocabulary size
+DESCRIPTION_WORDS = 40     # words per internship description (plus its skills)
+SKILLS_PER_INTERNSHIP = 3
+ZIPF_EXPONENT = 1.1
+ROLES = ["Data Science", "Backend", "Frontend", "Machine Learning", "Analytics", "Research", "Full Stack",
+         "Cloud", "Product", "QA"]
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvz" for v in "aeiou"]
+
+
+@lru_cache(maxsize=4)
+def word_pool(n_words=N_WORDS, seed=0):
+    """
+    `n_words` distinct pronounceable pseudo-words (2-4 syllables).
+    Cached; do not modify the returned array.
+    """
+    rng = np.random.default_rng(seed)
+    words, seen = [], set()
+    while len(words) < n_words:
+        word = "".join(rng.choice(SYLLABLES, size=rng.integers(2, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return np.array(words, dtype=object)
+
+
+def _zipf_probabilities(n_words, exponent=ZIPF_EXPONENT):
+    weights = 1.0 / np.arange(1, n_words + 1) ** exponent
+    return weights / weights.sum()
+
+
+def synthetic_catalog(n, seed=0, n_words=N_WORDS, description_words=DESCRIPTION_WORDS):
+    """
+    Returns a raw catalog DataFrame (id, company, title, description,
+    required_skills, link) with `n` rows, in the CSV layout the index
+    builder reads.
+    """
+    rng = np.random.default_rng(seed)
+    words = word_pool(n_words)
+    skills = np.array(DEFAULT_SKILLS, dtype=object)
+    tokens = rng.choice(n_words, size=(n, description_words), p=_zipf_probabilities(n_words))
+    skill_ids = rng.integers(0, len(skills), size=(n, SKILLS_PER_INTERNSHIP))
+    roles = rng.integers(0, len(ROLES), size=n)
+    required = [", ".join(dict.fromkeys(skills[row])) for row in skill_ids]
+    descriptions = [
+        " ".join(words[row]) + " " + required_skills.replace(",", "")
+        for row, required_skills in zip(tokens, required)
+    ]
+    ids = np.arange(1, n + 1)
+    return pd.DataFrame({
+        "id": ids,
+        "company": ["Company %d" % (i % max(1, n // 20)) for i in range(n)],
+        "title": ["%s Intern" % ROLES[r] for r in roles],
+        "description": descriptions,
+        "required_skills": required,
+        "link": ["https://example.com/internships/%d" % i for i in ids],
+    })
+
+
+def synthetic_labels(catalog, skill="python"):
+    """
+    Logistic training labels (internship_id,label): 1 for internships
+    requiring `skill`.
+    """
+    return pd.DataFrame({
+        "internship_id": catalog["id"],
+        "label": catalog["required_skills"].str.contains(skill, regex=False).astype(int),
+    })
+
+
+def synthetic_resume_pdf(seed, n_pages=1, n_words=N_WORDS, words_per_page=250):
+    """
+    Returns the bytes of a resume PDF with a skills line and
+    `n_pages` pages of project text.
+    """
+    pymupdf = _import_pymupdf()
+    rng = np.random.default_rng(seed)
+    words = word_pool(n_words)
+    probabilities = _zipf_probabilities(n_words)
+    skills = rng.choice(np.array(DEFAULT_SKILLS, dtype=object), size=rng.integers(3, 8), replace=False)
+    doc = pymupdf.open()
+    try:
+        for page_no in range(n_pages):
+            text = " ".join(words[rng.choice(n_words, size=words_per_page, p=probabilities)])
+            if page_no == 0:
+                text = "Candidate %d\nSkills: %s\n\nProjects\n%s" % (seed, ", ".join(skills), text)
+            page = doc.new_page()
+            page.insert_textbox(pymupdf.Rect(54, 54, 558, 738), text, fontsize=10)
+        return doc.tobytes()
+    finally:
+        doc.close()
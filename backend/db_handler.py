@@ -1,16 +1,182 @@
 import sqlite3
 import os
+import threading
+import time
+import functools
+from contextlib import contextmanager
 
 
 DB_PATH = "database/internify.db"  # SQLite database file path
 
+# Connection tuning (applied once per pooled connection)
+BUSY_TIMEOUT_MS = 5000       # wait this long on a locked database before failing
+CACHE_SIZE_KIB = 20000       # page cache per connection (negative PRAGMA value = KiB)
+STATEMENT_CACHE_SIZE = 128   # prepared statements kept per connection
+LOCK_RETRIES = 3             # extra attempts after busy_timeout still reports "locked"
+
+# Prepared statements: constant SQL strings so sqlite3's per-connection
+# statement cache reuses the compiled statement on every call.
+INSERT_USER_SQL = "INSERT INTO users (name, email, password) VALUES (?, ?, ?)"
+SELECT_USER_SQL = "SELECT * FROM users WHERE email=? AND password=?"
+INSERT_RESUME_SQL = "INSERT INTO resumes (user_id, parsed_text, skills) VALUES (?, ?, ?)"
+INSERT_MATCH_SQL = "INSERT INTO matches (user_id, internship_id, score, cluster) VALUES (?, ?, ?, ?)"
+INSERT_RUN_SQL = "INSERT INTO match_runs (user_id) VALUES (?)"
+INSERT_RUN_MATCH_SQL = "INSERT INTO matches (user_id, internship_id, score, cluster, run_id) VALUES (?, ?, ?, ?, ?)"
+DELETE_RUN_MATCHES_SQL = "DELETE FROM matches WHERE run_id = ?"
+DELETE_OLDER_RUNS_SQL = "DELETE FROM match_runs WHERE user_id = ? AND id != ?"
+DELETE_OLDER_MATCHES_SQL = "DELETE FROM matches WHERE user_id = ? AND (run_id IS NULL OR run_id != ?)"
+UPSERT_INTERNSHIP_SQL = """
+INSERT INTO internships (id, company, title, description, skills, link) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    company = excluded.company, title = excluded.title, description = excluded.description,
+    skills = excluded.skills, link = excluded.link
+"""
+GET_META_SQL = "SELECT value FROM app_meta WHERE key = ?"
+SET_META_SQL = "INSERT INTO app_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+MATCH_HISTORY_SQL = """
+SELECT COALESCE(internships.company, '') AS company, COALESCE(internships.title, '') AS title,
+       matches.score, matches.cluster, internships.link, matches.run_id, match_runs.created_at, matches.id
+FROM matches
+LEFT JOIN internships ON matches.internship_id = internships.id
+LEFT JOIN match_runs ON matches.run_id = match_runs.id
+WHERE matches.user_id = ? {keyset}
+ORDER BY matches.score DESC, matches.id DESC
+LIMIT ?
+"""
+CACHE_GET_SQL = "SELECT payload FROM result_cache WHERE key = ?"
+CACHE_PUT_SQL = "INSERT OR REPLACE INTO result_cache (key, payload, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)"
+CACHE_PRUNE_SQL = """
+DELETE FROM result_cache WHERE key IN (
+    SELECT key FROM result_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+)
+"""
+CACHE_MAX_ROWS = 5000        # on-disk result cache size (oldest rows pruned)
+CACHE_PRUNE_EVERY = 64       # prune after this many cache writes
+LATEST_RESUMES_SQL = """
+SELECT user_id, parsed_text FROM resumes
+WHERE id IN (SELECT MAX(id) FROM resumes {where} GROUP BY user_id)
+ORDER BY user_id
+"""
+USER_ID_CHUNK = 500          # ids per "user_id IN (...)" query (below SQLite's variable limit)
+INSERT_JOB_SQL = "INSERT INTO jobs (id, user_id, status, params, payload) VALUES (?, ?, 'queued', ?, ?)"
+NEXT_JOB_SQL = "SELECT id, user_id, params, payload FROM jobs WHERE status = 'queued' ORDER BY created_at, rowid LIMIT 1"
+START_JOB_SQL = """
+UPDATE jobs SET status = 'running', started_at = CURRENT_TIMESTAMP, heartbeat_at = CURRENT_TIMESTAMP
+WHERE id = ?
+"""
+HEARTBEAT_JOBS_SQL = "UPDATE jobs SET heartbeat_at = CURRENT_TIMESTAMP WHERE status = 'running' AND id IN ({ids})"
+FINISH_JOB_SQL = """
+UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, finished_at = CURRENT_TIMESTAMP
+WHERE id = ?
+"""
+REQUEUE_JOBS_SQL = """
+UPDATE jobs SET status = 'queued', started_at = NULL, heartbeat_at = NULL
+WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < datetime('now', ?)
+"""
+PURGE_JOBS_SQL = "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < datetime('now', ?)"
+GET_JOB_SQL = "SELECT id, user_id, status, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?"
+MATCH_HISTORY_KEYSET = "AND (matches.score, matches.id) < (?, ?)"  # row-value seek on the index
+
+_local = threading.local()   # one reusable connection per thread
+_dir_lock = threading.Lock()
+_ready_dirs = set()
+_cache_writes = 0
+
+
+def _ensure_db_dir(path):
+    """
+    Creates the database folder once per process instead of on every call.
+    """
+    folder = os.path.dirname(path) or "."
+    if folder not in _ready_dirs:
+        with _dir_lock:
+            os.makedirs(folder, exist_ok=True)
+            _ready_dirs.add(folder)
+
+
+def _configure(conn):
+    """
+    WAL lets readers proceed while one writer commits; synchronous=NORMAL
+    is durable across application crashes in WAL mode and avoids an fsync
+    per read transaction. busy_timeout makes writers wait instead of
+    raising "database is locked" immediately.
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
 
 def get_connection():
     """
-    Ensures the database folder exists and returns a SQLite connection.
+    Returns this thread's pooled SQLite connection, opening and tuning it
+    on first use. Connections are reused across calls; do not close them
+    (use close_connection() when a thread is done with the database).
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        _ensure_db_dir(DB_PATH)
+        conn = sqlite3.connect(
+            DB_PATH,
+            timeout=BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        _configure(conn)
+        _local.conn = conn
+        _local.path = DB_PATH
+    return conn
+
+
+def close_connection():
+    """
+    Closes the calling thread's pooled connection, if any.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+@contextmanager
+def transaction():
+    """
+    Yields the pooled connection inside a transaction: commits on success,
+    rolls back on error.
+    """
+    conn = get_connection()
+    with conn:
+        yield conn
+
+
+def retry_on_lock(func):
+    """
+    Retries a database operation with backoff when SQLite still reports
+    "database is locked" after busy_timeout (heavy concurrent writers).
+    The call is repeated with the same arguments: pass lists, not
+    iterators a failed attempt may already have consumed.
     """
-    os.makedirs("database", exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(LOCK_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == LOCK_RETRIES:
+                    raise
+                time.sleep(0.05 * (2 ** attempt))
+    return wrapper
+
+
+def _ensure_column(cur, table, column, declaration):
+    """
+    Adds a column to an existing table when an older schema lacks it.
+    """
+    existing = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
 
 
 def create_tables():
@@ -18,138 +184,382 @@ def create_tables():
     Creates application tables if they do not exist:
     - users: basic auth (name/email/password)
     - resumes: raw parsed resume storage
-    - internships: catalog of internships (optional for persistence)
-    - matches: user-to-internship match scores and cluster ids
+    - internships: catalog of internships, keyed by the catalog's internship_id
+    - match_runs: one row per pipeline run (upload), with its timestamp
+    - matches: user-to-internship match scores and cluster ids, grouped by run
+    - result_cache: optional on-disk tier of the pipeline result cache
+    - jobs: queued/running/finished background pipeline jobs
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # Users table
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        email TEXT UNIQUE,
-        password TEXT
-    )
-    """)
-
-    # Resumes table
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS resumes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        parsed_text TEXT,
-        skills TEXT,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    )
-    """)
-
-    # Internships table
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS internships (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT,
-        description TEXT,
-        skills TEXT
-    )
-    """)
-
-    # Matches table
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS matches (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        internship_id INTEGER,
-        score REAL,
-        cluster INTEGER,
-        FOREIGN KEY(user_id) REFERENCES users(id),
-        FOREIGN KEY(internship_id) REFERENCES internships(id)
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cur = conn.cursor()
+
+        # Users table
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            email TEXT UNIQUE,
+            password TEXT
+        )
+        """)
+
+        # Resumes table
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS resumes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            parsed_text TEXT,
+            skills TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+        """)
+
+        # Internships table
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS internships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            description TEXT,
+            skills TEXT
+        )
+        """)
+
+        # Matches table
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            internship_id INTEGER,
+            score REAL,
+            cluster INTEGER,
+            FOREIGN KEY(user_id) REFERENCES users(id),
+            FOREIGN KEY(internship_id) REFERENCES internships(id)
+        )
+        """)
+
+        # Match runs table (one per upload / pipeline run)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS match_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+        """)
+        _ensure_column(cur, "matches", "run_id", "INTEGER REFERENCES match_runs(id)")
+        _ensure_column(cur, "internships", "company", "TEXT")
+        _ensure_column(cur, "internships", "link", "TEXT")
 
+        # Key/value metadata (e.g. which index version the internships table mirrors)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """)
 
+        # Pipeline result cache (optional on-disk tier, see utils/result_cache.py)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS result_cache (
+            key TEXT PRIMARY KEY,
+            payload BLOB,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_created ON result_cache(created_at)")
+
+        # Background jobs (SQLite-backed queue for async /upload_resume, see job_queue.py)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            status TEXT,
+            params TEXT,
+            payload BLOB,
+            result TEXT,
+            error TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        """)
+        _ensure_column(cur, "jobs", "heartbeat_at", "TEXT")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(status, finished_at)")
+
+        # Indexes: history lookups are keyset scans on (user_id, score, id);
+        # run replacement deletes by run_id.
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_matches_user_score ON matches(user_id, score DESC, id DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_matches_run ON matches(run_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_match_runs_user ON match_runs(user_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_resumes_user ON resumes(user_id, id)")
+
+
+@retry_on_lock
 def add_user(name, email, password):
     """
     Inserts a new user. Returns True on success, False if email exists.
     """
-    conn = get_connection()
-    cur = conn.cursor()
     try:
-        cur.execute("INSERT INTO users (name, email, password) VALUES (?, ?, ?)", (name, email, password))
-        conn.commit()
+        with transaction() as conn:
+            conn.execute(INSERT_USER_SQL, (name, email, password))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 
 def get_user(email, password):
     """
     Fetches a user row (tuple) by email/password or None if not found.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE email=? AND password=?", (email, password))
-    user = cur.fetchone()
-    conn.close()
-    return user
+    return get_connection().execute(SELECT_USER_SQL, (email, password)).fetchone()
 
 
+@retry_on_lock
 def save_resume(user_id, parsed_text, skills):
     """
     Persists a parsed resume for a user.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO resumes (user_id, parsed_text, skills) VALUES (?, ?, ?)", (user_id, parsed_text, skills))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(INSERT_RESUME_SQL, (user_id, parsed_text, skills))
 
 
+@retry_on_lock
 def save_match(user_id, internship_id, score, cluster):
     """
     Persists a single match result (score + cluster) for a user and internship.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO matches (user_id, internship_id, score, cluster) VALUES (?, ?, ?, ?)",
-                (user_id, internship_id, score, cluster))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(INSERT_MATCH_SQL, (user_id, internship_id, score, cluster))
 
 
-def get_matches_for_user(user_id):
+def save_matches(user_id, rows, run_id=None, replace=False):
     """
-    Returns a list of (company, title, score, cluster) tuples for a given user_id,
-    ordered by score descending.
+    Persists all match results of one pipeline run in a single transaction
+    (one commit/fsync regardless of how many rows).
+    rows: iterable of (internship_id, score, cluster); read once, before any
+          retry, so a retried write inserts the same rows.
+    run_id: None records a new run; an existing run id has its previous
+            matches replaced atomically (e.g. when a run is retried).
+    replace: also drop the user's earlier runs in the same transaction.
+    Returns the run id.
+    """
+    return _save_matches(user_id, [tuple(row) for row in rows], run_id, replace)
+
+
+@retry_on_lock
+def _save_matches(user_id, rows, run_id, replace):
+    with transaction() as conn:
+        if run_id is None:
+            run_id = conn.execute(INSERT_RUN_SQL, (user_id,)).lastrowid
+        else:
+            conn.execute(DELETE_RUN_MATCHES_SQL, (run_id,))
+        conn.executemany(
+            INSERT_RUN_MATCH_SQL,
+            [(user_id, internship_id, score, cluster, run_id) for internship_id, score, cluster in rows],
+        )
+        if replace:
+            conn.execute(DELETE_OLDER_MATCHES_SQL, (user_id, run_id))
+            conn.execute(DELETE_OLDER_RUNS_SQL, (user_id, run_id))
+    return run_id
+
+
+def save_matches_bulk(runs, replace=False):
+    """
+    Persists many users' runs in one transaction (batch re-matching).
+    runs: iterable of (user_id, rows) with rows as in save_matches (read
+          once, before any retry).
+    replace: each new run also drops that user's earlier runs.
+    Returns the list of new run ids, in input order.
+    """
+    return _save_matches_bulk([(user_id, [tuple(row) for row in rows]) for user_id, rows in runs], replace)
+
+
+@retry_on_lock
+def _save_matches_bulk(runs, replace):
+    run_ids = []
+    with transaction() as conn:
+        for user_id, rows in runs:
+            run_id = conn.execute(INSERT_RUN_SQL, (user_id,)).lastrowid
+            conn.executemany(
+                INSERT_RUN_MATCH_SQL,
+                [(user_id, internship_id, score, cluster, run_id) for internship_id, score, cluster in rows],
+            )
+            if replace:
+                conn.execute(DELETE_OLDER_MATCHES_SQL, (user_id, run_id))
+                conn.execute(DELETE_OLDER_RUNS_SQL, (user_id, run_id))
+            run_ids.append(run_id)
+    return run_ids
+
+
+def iter_latest_resumes(user_ids=None, batch_size=500):
+    """
+    Yields (user_id, parsed_text) for each user's most recent stored resume,
+    fetching `batch_size` rows at a time. Optionally limited to user_ids:
+    filtered in SQL (seeks on idx_resumes_user), USER_ID_CHUNK ids per query.
+    """
+    if user_ids is None:
+        queries = [(LATEST_RESUMES_SQL.format(where=""), ())]
+    else:
+        wanted = sorted(set(int(user_id) for user_id in user_ids))
+        queries = [
+            (LATEST_RESUMES_SQL.format(where="WHERE user_id IN (%s)" % ",".join("?" * len(chunk))), chunk)
+            for chunk in (wanted[i:i + USER_ID_CHUNK] for i in range(0, len(wanted), USER_ID_CHUNK))
+        ]
+    for sql, params in queries:
+        cur = get_connection().execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+
+
+def get_matches_for_user(user_id, limit=50, after=None):
+    """
+    Returns one page of a user's match history, ordered by score descending:
+    a list of (company, title, score, cluster, link, run_id, created_at, match_id)
+    tuples. `after` is the (score, match_id) of the previous page's last row;
+    the query seeks on idx_matches_user_score, so each page costs O(limit).
+    """
+    if after is None:
+        sql, params = MATCH_HISTORY_SQL.format(keyset=""), (user_id, limit)
+    else:
+        score, match_id = after
+        sql = MATCH_HISTORY_SQL.format(keyset=MATCH_HISTORY_KEYSET)
+        params = (user_id, score, match_id, limit)
+    return get_connection().execute(sql, params).fetchall()
+
+
+def sync_internships(rows, version=None):
+    """
+    Upserts catalog rows into the internships table in one transaction so
+    matches.internship_id joins to real catalog entries.
+    rows: iterable of (internship_id, company, title, description, skills, link);
+          read once, before any retry.
+    version: optional catalog/index version recorded in app_meta, in the
+             same transaction, so it is only set once the rows are written.
+    """
+    _sync_internships([tuple(row) for row in rows], version)
+
+
+@retry_on_lock
+def _sync_internships(rows, version):
+    with transaction() as conn:
+        conn.executemany(UPSERT_INTERNSHIP_SQL, rows)
+        if version is not None:
+            conn.execute(SET_META_SQL, ("internships_version", version))
+
+
+def cache_get(key):
+    """
+    Returns the cached payload (bytes) for key, or None.
+    """
+    row = get_connection().execute(CACHE_GET_SQL, (key,)).fetchone()
+    return row[0] if row else None
+
+
+@retry_on_lock
+def cache_put(key, payload):
+    """
+    Stores a cache payload; every CACHE_PRUNE_EVERY writes the table is
+    trimmed to the newest CACHE_MAX_ROWS entries.
+    """
+    global _cache_writes
+    with transaction() as conn:
+        conn.execute(CACHE_PUT_SQL, (key, sqlite3.Binary(payload)))
+        _cache_writes += 1
+        if _cache_writes % CACHE_PRUNE_EVERY == 0:
+            conn.execute(CACHE_PRUNE_SQL, (CACHE_MAX_ROWS,))
+
+
+@retry_on_lock
+def enqueue_job(job_id, user_id, params, payload):
+    """
+    Adds a queued job. params: JSON text; payload: the resume PDF bytes.
+    """
+    with transaction() as conn:
+        conn.execute(INSERT_JOB_SQL, (job_id, user_id, params, sqlite3.Binary(payload)))
+
+
+@retry_on_lock
+def claim_job():
+    """
+    Atomically takes the oldest queued job and marks it running.
+    BEGIN IMMEDIATE holds the write lock across select + update, so two
+    workers (threads or processes) can never claim the same job.
+    Returns (job_id, user_id, params, payload) or None.
     """
     conn = get_connection()
-    cur = conn.cursor()
-    # Note: 'internships' table schema does not include a 'company' column.
-    # To avoid errors, return an empty company string and the stored internship title if present.
-    cur.execute(
-        """
-        SELECT '' as company, internships.title, matches.score, matches.cluster
-        FROM matches
-        JOIN internships ON matches.internship_id = internships.id
-        WHERE matches.user_id = ?
-        ORDER BY matches.score DESC
-        """,
-        (user_id,)
-    )
-    results = cur.fetchall()
-    conn.close()
-    return results
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(NEXT_JOB_SQL).fetchone()
+        if row is not None:
+            conn.execute(START_JOB_SQL, (row[0],))
+    return row
 
 
-if __name__ == "__main__":
-    create_tables()
-    print("✅ Database and tables initialized successfully!")
+@retry_on_lock
+def finish_job(job_id, status, result=None, error=None):
+    """
+    Records a job's final status ("done" / "failed"), its JSON result or
+    error, and drops the stored payload.
+    """
+    with transaction() as conn:
+        conn.execute(FINISH_JOB_SQL, (status, result, error, job_id))
+
+
+@retry_on_lock
+def heartbeat_jobs(job_ids):
+    """
+    Marks running jobs as still owned by a live worker (heartbeat_at = now).
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    with transaction() as conn:
+        conn.execute(HEARTBEAT_JOBS_SQL.format(ids=",".join("?" * len(job_ids))), job_ids)
 
 
+@retry_on_lock
+def requeue_stale_jobs(older_than_seconds):
+    """
+    Puts "running" jobs whose worker sent no heartbeat for
+    `older_than_seconds` (worker died) back in the queue.
+    Returns the number of jobs requeued.
+    """
+    with transaction() as conn:
+        return conn.execute(REQUEUE_JOBS_SQL, (f"-{int(older_than_seconds)} seconds",)).rowcount
 
+
+@retry_on_lock
+def purge_finished_jobs(older_than_seconds):
+    """
+    Deletes "done" / "failed" jobs (and their stored results) that
+    finished more than `older_than_seconds` ago.
+    Returns the number of jobs deleted.
+    """
+    with transaction() as conn:
+        return conn.execute(PURGE_JOBS_SQL, (f"-{int(older_than_seconds)} seconds",)).rowcount
+
+
+def get_job(job_id):
+    """
+    Returns (id, user_id, status, result, error, created_at, started_at,
+    finished_at) for a job, or None.
+    """
+    return get_connection().execute(GET_JOB_SQL, (job_id,)).fetchone()
+
+
+def get_meta(key):
+    """
+    Returns a value from the app_meta table, or None.
+    """
+    row = get_connection().execute(GET_META_SQL, (key,)).fetchone()
+    return row[0] if row else None
+
+
+if __name__ == "__main__":
+    create_tables()
+    print("✅ Database and tables initialized successfully!")
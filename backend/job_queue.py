@@ -0,0 +1,233 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from db_handler import (
+    enqueue_job, claim_job, finish_job, heartbeat_jobs, requeue_stale_jobs, purge_finished_jobs, get_job,
+    create_tables,
+)
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process (0 = this process only enqueues; run
+# `python job_queue.py` separately to consume). Every process polls the
+# same SQLite jobs table, so throughput scales with processes × workers.
+JOB_WORKERS = int(os.getenv("INTERNIFY_JOB_WORKERS", "2"))
+POLL_INTERVAL = 1.0          # seconds between queue checks when idle
+HEARTBEAT_INTERVAL = 30.0    # seconds between heartbeats of a process's running jobs
+STALE_JOB_SECONDS = 120      # "running" jobs without a heartbeat this long are requeued
+# Finished/failed jobs (with their results) are deleted this long after finishing
+JOB_RETENTION_SECONDS = float(os.getenv("INTERNIFY_JOB_RETENTION_HOURS", "24")) * 3600
+PURGE_INTERVAL = 3600.0      # seconds between retention sweeps per process
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a local pool of worker threads.
+    - submit: stores the job (params + resume bytes) and wakes a worker
+    - workers: claim the oldest queued job, run `handler`, store the result
+    - heartbeat: every HEARTBEAT_INTERVAL a thread touches this process's
+      running jobs and requeues jobs whose worker stopped beating for
+      STALE_JOB_SECONDS (its process died), so a long job keeps its claim
+    - retention: every PURGE_INTERVAL a worker deletes jobs finished more
+      than JOB_RETENTION_SECONDS ago
+    `handler(user_id, payload, params)` must return a JSON-serializable dict
+    (see run_job: dispatches on params["job"]).
+    """
+    def __init__(self, handler, workers=JOB_WORKERS, poll_interval=POLL_INTERVAL,
+                 retention_seconds=JOB_RETENTION_SECONDS, purge_interval=PURGE_INTERVAL,
+                 heartbeat_interval=HEARTBEAT_INTERVAL, stale_seconds=STALE_JOB_SECONDS):
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_seconds = stale_seconds
+        self.retention_seconds = retention_seconds
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self._running = set()        # ids of jobs this process is running
+        self._running_lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the worker threads (again after a fork, e.g. gunicorn --preload).
+        """
+        with self._lock:
+            if self._pid == os.getpid() or self.workers <= 0:
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._running = set()
+            self._requeue_stale()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            self._threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._pid = None
+
+    def submit(self, user_id, payload, params=None):
+        """
+        Enqueues a job and returns its id immediately.
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        enqueue_job(job_id, user_id, json.dumps(params or {}), payload)
+        self._wakeup.set()
+        return job_id
+
+    def purge(self):
+        """
+        Deletes finished jobs past the retention period now. Returns the count.
+        """
+        deleted = purge_finished_jobs(self.retention_seconds)
+        if deleted:
+            logger.info("Purged %d finished job(s) older than %.0fs", deleted, self.retention_seconds)
+        return deleted
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._purge_if_due()
+            job = claim_job()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self.run_job(*job)
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            with self._running_lock:
+                running = list(self._running)
+            try:
+                heartbeat_jobs(running)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+            self._requeue_stale()
+
+    def _requeue_stale(self):
+        try:
+            requeued = requeue_stale_jobs(self.stale_seconds)
+        except Exception:
+            logger.exception("Requeueing stale jobs failed")
+            return
+        if requeued:
+            logger.warning("Requeued %d job(s) with no heartbeat for %.0fs", requeued, self.stale_seconds)
+            self._wakeup.set()
+
+    def _purge_if_due(self):
+        # One worker thread per PURGE_INTERVAL runs the sweep
+        with self._purge_lock:
+            if time.monotonic() < self._next_purge:
+                return
+            self._next_purge = time.monotonic() + self.purge_interval
+        try:
+            self.purge()
+        except Exception:
+            logger.exception("Job retention sweep failed")
+
+    def run_job(self, job_id, user_id, params, payload):
+        """
+        Runs one claimed job and records "done" with its result or "failed".
+        The heartbeat thread keeps the job owned while it runs.
+        """
+        with self._running_lock:
+            self._running.add(job_id)
+        try:
+            result = self.handler(user_id, bytes(payload), json.loads(params or "{}"))
+            finish_job(job_id, "done", result=json.dumps(result))
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            finish_job(job_id, "failed", error=str(e))
+        finally:
+            with self._running_lock:
+                self._running.discard(job_id)
+
+
+def job_status(job_id):
+    """
+    Returns a JSON-ready dict describing a job, or None if unknown.
+    """
+    row = get_job(job_id)
+    if row is None:
+        return None
+    job_id, user_id, status, result, error, created_at, started_at, finished_at = row
+    payload = {
+        "job_id": job_id,
+        "user_id": user_id,
+        "status": status,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+    }
+    if result is not None:
+        payload["result"] = json.loads(result)
+    if error is not None:
+        payload["error"] = error
+    return payload
+
+
+def run_resume_job(user_id, payload, params):
+    """
+    Default job handler: runs the recommender pipeline on the stored PDF.
+    """
+    from recommender_pipeline import process_resume, results_payload
+    return results_payload(process_resume(payload, user_id, **params))
+
+
+def run_batch_job(user_id, payload, params):
+    """
+    Batch re-matching job (POST /batch_match): re-scores the latest stored
+    resume of params["user_ids"] (None = every user). No payload.
+    """
+    from batch_match import match_stored_resumes
+    runs = match_stored_resumes(params.get("user_ids"), k=params["k"])
+    return {"processed": len(runs), "runs": [{"user_id": r["user_id"], "run_id": r["run_id"]} for r in runs]}
+
+
+JOB_HANDLERS = {"resume": run_resume_job, "batch_match": run_batch_job}
+
+
+def run_job(user_id, payload, params):
+    """
+    JobQueue handler: runs JOB_HANDLERS[params["job"]] (default "resume",
+    which is also what jobs queued before job kinds existed are).
+    """
+    params = dict(params)
+    return JOB_HANDLERS[params.pop("job", "resume")](user_id, payload, params)
+
+
+if __name__ == "__main__":
+    # Standalone worker process: consumes the shared jobs table without HTTP.
+    parser = argparse.ArgumentParser(description="Run Internify background job workers.")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    create_tables()
+    queue = JobQueue(run_job, workers=args.workers)
+    queue.start()
+    print(f"✅ {args.workers} job worker(s) polling the jobs table (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        queue.stop(timeout=5)
@@ -0,0 +1,53 @@
+# ------------------------------------------------------------
+# artifacts.py
+# On-disk format of trained model files in data/model_files/:
+# a pickled {"model": <sklearn estimator>, "meta": {...}} dict whose
+# meta records the artifact version and the index vocabulary it was
+# trained against. Written via temp file + os.replace so a reader
+# never sees a half-written file.
+# ------------------------------------------------------------
+
+import os
+import pickle
+import time
+
+
+def save_artifact(path, model, meta):
+    """
+    Pickles {"model", "meta"} to `path` via a temp file + os.replace.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = "%s.tmp-%d" % (path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"model": model, "meta": meta}, f)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path):
+    """
+    Returns (model, meta) from a saved artifact; bare pickled models
+    from older releases load with empty meta.
+    """
+    with open(path, "rb") as f:
+        payload = pickle.load(f)
+    if isinstance(payload, dict) and "model" in payload:
+        return payload["model"], payload.get("meta") or {}
+    return payload, {}
+
+
+def artifact_meta(kind, index, **extra):
+    """
+    Metadata for a model trained on `index`: a version id plus the
+    vocabulary hash / width the model expects its input vectors in.
+    """
+    trained_at = time.gmtime()
+    meta = {
+        "kind": kind,
+        "version": "%s-%s-%s" % (kind, time.strftime("%Y%m%d%H%M%S", trained_at), index.vocabulary_hash[:8]),
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", trained_at),
+        "vocabulary_hash": index.vocabulary_hash,
+        "n_features": int(index.matrix.shape[1]),
+        "index_version": index.version,
+    }
+    meta.update(extra)
+    return meta
@@ -0,0 +1,133 @@
+# ------------------------------------------------------------
+# cluster_index.py
+# KMeans cluster labels computed once at index build time.
+# - labels: cluster id of every internship (the "cluster" shown in
+#   results and the pie chart); no predict() on the request path.
+# - Coarse retrieval: a resume is assigned to its nearest centroids
+#   and only internships in the top-N clusters are scored
+#   (INTERNIFY_CLUSTER_PROBE=N). If those clusters hold fewer than
+#   CLUSTER_MIN_CANDIDATES rows, the whole catalog is scanned.
+# ------------------------------------------------------------
+
+import os
+
+import numpy as np
+
+from models.kmeans_model import KMeansModel
+
+CLUSTER_PROBE = int(os.getenv("INTERNIFY_CLUSTER_PROBE", "0"))                  # 0 = score every cluster
+CLUSTER_MIN_CANDIDATES = int(os.getenv("INTERNIFY_CLUSTER_MIN_CANDIDATES", "200"))
+
+INDEX_BUILD_VERSION = "index-build"   # model_version when no KMeans artifact was available
+
+FILES = ("labels", "centroids", "order", "offsets")
+
+
+class ClusterIndex:
+    """
+    Per-internship KMeans labels, the centroids (TF-IDF space) and a
+    posting list per cluster: rows of cluster c are order[offsets[c]:offsets[c + 1]].
+    """
+    def __init__(self, labels, centroids, order, offsets, model_version=None):
+        self.model_version = model_version
+        self.labels = labels
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self._centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+
+    @property
+    def n_clusters(self):
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, matrix, base=None, kmeans_model=None):
+        """
+        Labels every row of `matrix`. Centroids come from `base` (incremental
+        updates), else `kmeans_model` (the trained artifact), else a
+        KMeansModel fitted here (index build is offline; see
+        `python -m models.train kmeans`). `model_version` records which.
+        """
+        if base is not None:
+            centroids, model_version = base.centroids, base.model_version
+        else:
+            if kmeans_model is None:
+                kmeans_model = KMeansModel(n_clusters=min(KMeansModel().model.n_clusters, matrix.shape[0]))
+                kmeans_model.train(matrix)
+                model_version = INDEX_BUILD_VERSION
+            else:
+                model_version = kmeans_model.meta.get("version", "unversioned")
+            centroids = np.asarray(kmeans_model.model.cluster_centers_, dtype=np.float64)
+        labels = _nearest(matrix, centroids, 1)[:, 0].astype(np.int16)
+        return cls._from_labels(labels, centroids, model_version)
+
+    def updated(self, keep_rows, matrix):
+        """
+        Returns a new index holding the labels of rows `keep_rows` followed
+        by those of `matrix` (new TF-IDF rows), labelled with these centroids.
+        Only the new rows are scored against the centroids.
+        """
+        labels = np.concatenate([
+            np.asarray(self.labels)[keep_rows],
+            self.nearest(matrix, 1)[:, 0].astype(np.int16),
+        ])
+        return self._from_labels(labels, self.centroids, self.model_version)
+
+    @classmethod
+    def _from_labels(cls, labels, centroids, model_version):
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(labels[order], np.arange(centroids.shape[0] + 1)).astype(np.int64)
+        return cls(labels, centroids, order, offsets, model_version)
+
+    def nearest(self, vectors, n):
+        """
+        Indices of the `n` nearest centroids (Euclidean) per row of `vectors`.
+        """
+        return _nearest(vectors, self.centroids, n, self._centroid_norms)
+
+    def rows(self, clusters):
+        """
+        Row indices (ascending) of every internship in the given clusters.
+        """
+        rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in clusters])
+        return np.sort(rows)
+
+    def candidates(self, resume_vector, n_probe=CLUSTER_PROBE, min_candidates=CLUSTER_MIN_CANDIDATES):
+        """
+        Rows of the resume's `n_probe` nearest clusters, or None (full scan)
+        when pruning is off or would leave fewer than `min_candidates` rows.
+        """
+        if n_probe <= 0 or n_probe >= self.n_clusters:
+            return None
+        rows = self.rows(self.nearest(resume_vector, n_probe)[0])
+        if rows.shape[0] < min_candidates:
+            return None
+        return rows
+
+    def save(self, path):
+        for name in FILES:
+            np.save(os.path.join(path, "cluster_%s.npy" % name), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap_mode=None, model_version=None):
+        """
+        Loads the cluster arrays from an index version dir, or returns None
+        when that version was built without them.
+        """
+        paths = [os.path.join(path, "cluster_%s.npy" % name) for name in FILES]
+        if not all(os.path.exists(p) for p in paths):
+            return None
+        return cls(*(np.load(p, mmap_mode=mmap_mode) for p in paths), model_version=model_version)
+
+
+def _nearest(vectors, centroids, n, centroid_norms=None):
+    # argmin ||x - c||² = argmin (||c||² - 2 x·c); ||x||² is constant per row
+    if centroid_norms is None:
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    distances = centroid_norms[None, :] - 2.0 * np.asarray(vectors.dot(centroids.T))
+    n = min(n, centroids.shape[0])
+    if n == 1:
+        return np.argmin(distances, axis=1)[:, None]
+    nearest = np.argpartition(distances, n - 1, axis=1)[:, :n]
+    order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+    return np.take_along_axis(nearest, order, axis=1)
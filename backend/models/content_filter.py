@@ -1,84 +1,66 @@
 # ------------------------------------------------------------
 # content_filter.py
-# Text similarity utilities and a simple TF-IDF based recommender.
+# Text similarity utilities and a simple skills-only recommender.
 # - ContentFilter.get_similarity: cosine-similarity between a single
 #   resume vector and a set of internship vectors (pre-computed).
-# - get_recommendations: optional TF-IDF pipeline over CSV to get
-#   top-N similar internships given extracted skills.
+# - get_recommendations: top-N similar internships for a list of
+#   extracted skills, over the persisted TF-IDF index shared with the
+#   main pipeline (loaded on first use; importing this module does
+#   no I/O).
 # ------------------------------------------------------------
 
-import pandas as pd
-import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.metrics.pairwise import cosine_similarity, linear_kernel
 
-# ------------------------------------------------------------
-# Load dataset (once globally so it’s not reloaded every time)
-# ------------------------------------------------------------
-# Try to load dataset relative to this file; keep optional to avoid import-time crashes
-try:
-    BASE_DIR = os.path.dirname(__file__)
-    DATA_PATH = os.path.normpath(os.path.join(BASE_DIR, "..", "data", "internships.csv"))
-    internship_df = pd.read_csv(DATA_PATH)
-    # Normalize column names expected downstream
-    if "skills_required" not in internship_df.columns and "required_skills" in internship_df.columns:
-        internship_df = internship_df.rename(columns={"required_skills": "skills_required"})
-except Exception:
-    internship_df = pd.DataFrame(columns=["title", "description", "skills_required"])
+from models.internship_index import get_index
+from utils.topk import top_k
 
-# Combine all useful text columns into one “combined” column
-# This helps TF-IDF learn relationships between title, description, and skills
-if not internship_df.empty:
-    internship_df["combined"] = (
-        internship_df["title"].fillna('') + " " +
-        internship_df["description"].fillna('') + " " +
-        internship_df["skills_required"].fillna('')
-    )
-else:
-    internship_df["combined"] = []
+# Legacy output keys of get_recommendations → normalized catalog columns
+RECOMMENDATION_COLUMNS = {
+    "id": "internship_id",
+    "title": "title",
+    "company": "company",
+    "skills_required": "required_skills",
+}
 
-# ------------------------------------------------------------
-# Create TF-IDF matrix
-# ------------------------------------------------------------
-tfidf = TfidfVectorizer(stop_words="english")  # remove common words (like “and”, “the”)
-tfidf_matrix = tfidf.fit_transform(internship_df["combined"]) if not internship_df.empty else None
 
 class ContentFilter:
     """
     Provides cosine-similarity between a single resume vector and
     a matrix of internship vectors. Expects pre-computed vectors.
     """
-    def get_similarity(self, resume_vector, internship_vectors):
+    def get_similarity(self, resume_vector, internship_vectors, normalized=False):
         """
         Computes cosine similarity between one resume vector (1 x d)
         and many internship vectors (n x d). Returns a 1D array of
         length n with similarity scores in [0, 1].
+        Pass normalized=True when both inputs are already L2-normalized
+        (e.g. TF-IDF index rows) to skip re-normalizing the catalog matrix.
         """
+        if normalized:
+            return linear_kernel(resume_vector, internship_vectors).flatten()
         return cosine_similarity(resume_vector, internship_vectors).flatten()
 
 
-def get_recommendations(extracted_skills, top_n=5):
+def get_recommendations(extracted_skills, top_n=5, index=None):
     """
     Input  : extracted_skills → list of skills (from NLP)
-    Output : Top N internship recommendations (DataFrame rows)
-    Notes  : Uses this module's TF-IDF pipeline over internships.csv.
-             This is a legacy helper and not used by the new pipeline.
+    Output : Top N internship recommendations (list of dicts with
+             id, title, company, skills_required)
+    Notes  : Scores against the shared internship index (get_index());
+             a legacy helper, not used by the new pipeline.
     """
-    # Convert skills list to string for vectorization
-    resume_text = " ".join(extracted_skills)
-
-    # Vectorize resume text using the same TF-IDF model
-    resume_vector = tfidf.transform([resume_text]) if tfidf_matrix is not None else None
-
-    # Compute cosine similarity between resume and all internships
-    if tfidf_matrix is None or resume_vector is None:
+    index = index or get_index()
+    if not extracted_skills or len(index) == 0:
         return []
-    similarity_scores = cosine_similarity(resume_vector, tfidf_matrix).flatten()
+
+    # Vectorize the skills with the index's fitted TF-IDF (no refit)
+    resume_vector = index.transform([" ".join(extracted_skills)])
+    similarity_scores = ContentFilter().get_similarity(resume_vector, index.matrix, normalized=True)
 
     # Get top N most similar internships (highest cosine values)
-    top_indices = similarity_scores.argsort()[-top_n:][::-1]
+    top_indices = top_k(similarity_scores, top_n)
 
     # Return corresponding rows as a list of dictionaries
-    cols = [c for c in ["id", "title", "company", "skills_required"] if c in internship_df.columns]
-    results = internship_df.iloc[top_indices][cols]
-    return results.to_dict(orient="records")
\ No newline at end of file
+    cols = {key: col for key, col in RECOMMENDATION_COLUMNS.items() if col in index.catalog.columns}
+    results = index.catalog.iloc[top_indices][list(cols.values())]
+    return results.rename(columns={col: key for key, col in cols.items()}).to_dict(orient="records")
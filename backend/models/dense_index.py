@@ -0,0 +1,240 @@
+# ------------------------------------------------------------
+# dense_index.py
+# Optional dense retrieval stage over the TF-IDF index.
+# - DenseIndex.build: TruncatedSVD (LSA) projection of the TF-IDF
+#   rows into L2-normalized float32 vectors, plus an IVF (inverted
+#   file) index: k-means coarse centroids and one posting list of
+#   rows per centroid.
+# - search: probes the `n_probe` nearest lists and returns the best
+#   `n_candidates` rows by dense score; the pipeline re-ranks those
+#   exactly with TF-IDF cosine + logistic + skill overlap.
+# - Recall vs latency: more probes / candidates → higher recall,
+#   slower queries. Measure with:
+#       python -m models.dense_index bench --nprobe 1 4 16 --candidates 100 400
+#
+# Enable with INTERNIFY_DENSE=1 and rebuild the index
+# (python -m models.internship_index build --dense).
+# ------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+
+from utils.topk import top_k
+
+DENSE_ENABLED = os.getenv("INTERNIFY_DENSE", "0").strip().lower() in ("1", "true", "yes", "on")
+DENSE_DIM = int(os.getenv("INTERNIFY_DENSE_DIM", "128"))                 # SVD components
+DENSE_LISTS = int(os.getenv("INTERNIFY_DENSE_LISTS", "0"))               # IVF lists; 0 = sqrt(n_docs)
+DENSE_NPROBE = int(os.getenv("INTERNIFY_DENSE_NPROBE", "8"))             # lists probed per query
+DENSE_CANDIDATES = int(os.getenv("INTERNIFY_DENSE_CANDIDATES", "200"))   # rows re-ranked exactly
+ASSIGN_CHUNK = 65536   # rows per block when assigning vectors to centroids
+
+FILES = ("components", "vectors", "centroids", "order", "offsets")
+
+
+class DenseIndex:
+    """
+    LSA projection (components, n_components x n_features) with the
+    projected internship vectors and an IVF index over them:
+    rows of list l are order[offsets[l]:offsets[l + 1]].
+    """
+    def __init__(self, components, vectors, centroids, order, offsets):
+        self.components = components
+        self.vectors = vectors
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @classmethod
+    def build(cls, matrix, n_components=DENSE_DIM, n_lists=DENSE_LISTS, base=None):
+        """
+        Fits the SVD projection and IVF centroids over `matrix` (the
+        TF-IDF rows). With `base`, its projection and centroids are reused
+        and only the rows are projected and assigned (incremental updates).
+        """
+        n_docs, n_features = matrix.shape
+        if base is None:
+            n_components = max(1, min(n_components, n_features - 1, n_docs - 1))
+            svd = TruncatedSVD(n_components=n_components, random_state=42).fit(matrix)
+            components = svd.components_.astype(np.float32)
+        else:
+            components = base.components
+        vectors = _normalize(np.asarray(matrix.dot(components.T), dtype=np.float32))
+
+        if base is None:
+            n_lists = min(n_docs, n_lists or max(1, int(round(np.sqrt(n_docs)))))
+            kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=42, n_init=3,
+                                     batch_size=max(1024, 4 * n_lists))
+            kmeans.fit(vectors)
+            centroids = _normalize(kmeans.cluster_centers_.astype(np.float32))
+        else:
+            centroids = base.centroids
+        return cls._from_assignments(components, vectors, centroids, _assign(vectors, centroids))
+
+    def updated(self, keep_rows, matrix):
+        """
+        Returns a new index holding the vectors of rows `keep_rows` followed
+        by `matrix` (new TF-IDF rows) projected and assigned with this
+        index's SVD and centroids. Kept rows stay in their IVF lists.
+        """
+        assignments = np.empty(len(self), dtype=np.int64)
+        assignments[self.order] = np.repeat(np.arange(self.n_lists), np.diff(self.offsets))
+        added = self.project(matrix)
+        vectors = np.vstack([np.asarray(self.vectors)[keep_rows], added])
+        assignments = np.concatenate([assignments[keep_rows], _assign(added, self.centroids)])
+        return self._from_assignments(self.components, vectors, self.centroids, assignments)
+
+    @classmethod
+    def _from_assignments(cls, components, vectors, centroids, assignments):
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assignments[order], np.arange(centroids.shape[0] + 1)).astype(np.int64)
+        return cls(components, vectors, centroids, order, offsets)
+
+    def project(self, X):
+        """
+        Projects TF-IDF rows (sparse) into the dense, L2-normalized space.
+        """
+        return _normalize(np.asarray(X.dot(self.components.T), dtype=np.float32))
+
+    def search(self, query_vector, n_candidates=DENSE_CANDIDATES, n_probe=DENSE_NPROBE):
+        """
+        Returns up to `n_candidates` row indices (ascending) whose dense
+        vectors score best against the query within its `n_probe` nearest
+        IVF lists.
+        """
+        query = self.project(query_vector)[0]
+        lists = top_k(self.centroids.dot(query), n_probe)
+        rows = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+        if rows.shape[0] > n_candidates:
+            rows = rows[top_k(self.vectors[rows].dot(query), n_candidates)]
+        return np.sort(rows)
+
+    def save(self, path):
+        for name in FILES:
+            np.save(os.path.join(path, "dense_%s.npy" % name), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Loads the dense arrays from an index version dir, or returns None
+        when that version was built without them.
+        """
+        paths = [os.path.join(path, "dense_%s.npy" % name) for name in FILES]
+        if not all(os.path.exists(p) for p in paths):
+            return None
+        return cls(*(np.load(p, mmap_mode=mmap_mode) for p in paths))
+
+    def describe(self):
+        return {"n_components": int(self.components.shape[0]), "n_lists": int(self.n_lists)}
+
+
+def _normalize(X):
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.maximum(norms, 1e-12)
+
+
+def _assign(vectors, centroids):
+    """
+    Nearest centroid (max inner product) per row, in blocks of ASSIGN_CHUNK
+    rows so the score block stays small.
+    """
+    assignments = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], ASSIGN_CHUNK):
+        block = vectors[start:start + ASSIGN_CHUNK]
+        assignments[start:start + ASSIGN_CHUNK] = np.argmax(block.dot(centroids.T), axis=1)
+    return assignments
+
+
+# ------------------------------------------------------------
+# Recall / latency benchmark
+# ------------------------------------------------------------
+def benchmark(index, n_queries=200, k=10, n_probes=(1, 4, 16), candidates=(100, 400), seed=0):
+    """
+    Compares ANN + exact re-rank against exact brute-force cosine over
+    the TF-IDF rows. Queries are random halves of catalog descriptions.
+    Returns a list of dicts: n_probe, n_candidates, recall_at_k,
+    mean_ms, p95_ms (plus one "exact" row with n_probe=None).
+    """
+    dense = index.dense
+    if dense is None:
+        raise ValueError("Index has no dense vectors; rebuild with --dense")
+    rng = np.random.default_rng(seed)
+    texts = []
+    for row in rng.choice(len(index), size=min(n_queries, len(index)), replace=False):
+        words = str(index.catalog["description"].iloc[int(row)]).split()
+        keep = rng.random(len(words)) < 0.5
+        texts.append(" ".join(w for w, kept in zip(words, keep) if kept) or " ".join(words))
+    queries = index.transform(texts)
+
+    exact, timings = [], []
+    for i in range(queries.shape[0]):
+        started = time.perf_counter()
+        exact.append(set(top_k(index.matrix.dot(queries[i].T).toarray().ravel(), k).tolist()))
+        timings.append(time.perf_counter() - started)
+    results = [_bench_row(None, None, 1.0, timings)]
+
+    for n_probe in n_probes:
+        for n_candidates in candidates:
+            hits, timings = 0, []
+            for i in range(queries.shape[0]):
+                started = time.perf_counter()
+                rows = dense.search(queries[i], n_candidates, n_probe)
+                scores = index.matrix[rows].dot(queries[i].T).toarray().ravel()
+                found = rows[top_k(scores, k)]
+                timings.append(time.perf_counter() - started)
+                hits += len(exact[i].intersection(found.tolist()))
+            recall = hits / max(sum(len(e) for e in exact), 1)
+            results.append(_bench_row(n_probe, n_candidates, recall, timings))
+    return results
+
+
+def _bench_row(n_probe, n_candidates, recall, timings):
+    timings_ms = np.asarray(timings) * 1000.0
+    return {
+        "n_probe": n_probe,
+        "n_candidates": n_candidates,
+        "recall_at_k": round(float(recall), 4),
+        "mean_ms": round(float(timings_ms.mean()), 3),
+        "p95_ms": round(float(np.percentile(timings_ms, 95)), 3),
+    }
+
+
+if __name__ == "__main__":
+    from models.internship_index import INDEX_DIR, InternshipIndex
+
+    parser = argparse.ArgumentParser(description="Dense ANN retrieval tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Recall@k and latency of ANN + re-rank vs exact search")
+    bench_cmd.add_argument("--index", default=INDEX_DIR)
+    bench_cmd.add_argument("--queries", type=int, default=200)
+    bench_cmd.add_argument("--k", type=int, default=10)
+    bench_cmd.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16])
+    bench_cmd.add_argument("--candidates", type=int, nargs="+", default=[100, 400])
+    bench_cmd.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        loaded = InternshipIndex.load(args.index)
+        rows = benchmark(loaded, args.queries, args.k, args.nprobe, args.candidates)
+        if args.json:
+            for row in rows:
+                print(json.dumps(row))
+            sys.exit(0)
+        print("%d docs, %s" % (len(loaded), loaded.dense.describe()))
+        print("%-8s %-11s %-10s %-9s %-9s" % ("nprobe", "candidates", "recall@%d" % args.k, "mean ms", "p95 ms"))
+        for row in rows:
+            print("%-8s %-11s %-10.4f %-9.3f %-9.3f" % (
+                row["n_probe"] or "exact", row["n_candidates"] or "-", row["recall_at_k"], row["mean_ms"], row["p95_ms"]))
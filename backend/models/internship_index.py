@@ -0,0 +1,656 @@
+# ------------------------------------------------------------
+# internship_index.py
+# Persistent, pre-fitted TF-IDF index over the internship catalog.
+# - InternshipIndex.build: fits the vectorizer once over all
+#   descriptions and keeps the L2-normalized CSR matrix.
+# - save/load: versioned on-disk layout; the matrix arrays are
+#   memory-mapped on load so workers share the pages.
+# - apply_updates/update_index: upsert or retire internships by id,
+#   vectorizing only the changed rows with the fitted vocabulary. Once
+#   IDF drift crosses a threshold the index is flagged refit_needed;
+#   the refit itself runs offline (`refit`), since it changes the
+#   vocabulary the trained models were fitted on.
+# - get_index: process-wide cached index used by the request path;
+#   picks up a new CURRENT version without a restart.
+#
+# Layout on disk:
+#   data/index/CURRENT            → name of the active version dir
+#   data/index/<version>/meta.json, vocabulary.json (not in hashing
+#       mode), idf.npy, matrix_{data,indices,indptr}.npy (float32 data
+#       by default, see models/text_vectorizer.py), catalog.arrow (catalog.csv
+#       without pyarrow),
+#       skill_vocabulary.json, skills_{indices,indptr}.npy,
+#       cluster_*.npy (KMeans labels, see models/cluster_index.py),
+#       logistic_scores.npy (float32 logistic probability per row),
+#       dense_*.npy (optional, see models/dense_index.py)
+#
+# Rebuild with:  python -m models.internship_index build
+#                [--min-df 2] [--max-features 50000] [--hashing 262144]
+# Update with:   python -m models.internship_index update --upsert new.csv --retire 12 40
+# Refit with:    python -m models.internship_index refit, then
+#                python -m models.train kmeans / logistic (refreshes the index)
+# ------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from models.cluster_index import ClusterIndex
+from models.dense_index import DENSE_ENABLED, DenseIndex
+from models.registry import model_registry
+from models.skill_index import SkillIndex
+from models.text_vectorizer import default_params, make_vectorizer, parse_number
+from utils.catalog import (
+    CATALOG_PATH, arrow_available, load_catalog, normalize_catalog, read_catalog, write_catalog,
+)
+from utils.skill_matcher import get_skill_matcher
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = "data/index"        # Root folder holding all index versions
+FORMAT_VERSION = 2              # Bump when the on-disk layout changes
+KEEP_VERSIONS = 3               # Older version dirs are pruned after a build
+TEXT_COLUMN = "description"     # Catalog column the index is fitted on
+VECTORIZER_PARAMS = default_params()  # float32; INTERNIFY_TFIDF_* (see models/text_vectorizer.py)
+# Incremental updates keep the fitted IDF; once the IDF implied by the
+# current rows differs from it by more than this (relative L1), the index
+# is flagged refit_needed (meta) until an offline refit.
+IDF_DRIFT_THRESHOLD = float(os.getenv("INTERNIFY_IDF_DRIFT", "0.05"))
+# How often (seconds) a worker checks CURRENT for a newer index version.
+INDEX_POLL_SECONDS = float(os.getenv("INTERNIFY_INDEX_POLL", "2"))
+
+
+class InternshipIndex:
+    """
+    Fitted TF-IDF vocabulary + IDF weights together with the sparse
+    matrix of every internship description and the catalog rows it
+    was built from. A request only needs a single `transform`.
+    `skills` is the internship × skill incidence matrix (SkillIndex);
+    `clusters` holds the KMeans labels/centroids (ClusterIndex) and
+    `logistic` the per-row logistic probabilities (float32); both are
+    resume-independent and precomputed (see compute_signals). `dense` is
+    the optional ANN stage (DenseIndex). Any may be None.
+    """
+    def __init__(self, vectorizer, matrix, catalog, meta, skills, dense=None, clusters=None, logistic=None):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.catalog = catalog
+        self.meta = meta
+        self.skills = skills
+        self.dense = dense
+        self.clusters = clusters
+        self.logistic = logistic
+
+    @property
+    def version(self):
+        return self.meta["version"]
+
+    @property
+    def vocabulary_hash(self):
+        return self.meta["vocabulary_hash"]
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    # --------------------------------------------------------
+    # Building
+    # --------------------------------------------------------
+    @classmethod
+    def build(cls, catalog, vectorizer_params=None, dense=None):
+        """
+        Fits the TF-IDF vectorizer (make_vectorizer(vectorizer_params))
+        over the catalog descriptions and returns a new in-memory index.
+        `catalog` is a normalized DataFrame.
+        `dense` also builds the ANN stage (default: INTERNIFY_DENSE).
+        """
+        params = dict(VECTORIZER_PARAMS if vectorizer_params is None else vectorizer_params)
+        catalog = catalog.reset_index(drop=True)
+        if catalog["internship_id"].duplicated().any():
+            raise ValueError("Catalog contains duplicate internship ids")
+        vectorizer = make_vectorizer(params)
+        matrix = vectorizer.fit_transform(catalog[TEXT_COLUMN].astype(str).tolist())
+        matrix = _as_csr(matrix)
+        if hasattr(vectorizer, "stop_words_"):
+            del vectorizer.stop_words_  # every pruned term; only needed for introspection
+        skills = _build_skills(catalog)
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "text_column": TEXT_COLUMN,
+            "vectorizer_params": params,
+            "n_docs": int(matrix.shape[0]),
+            "n_features": int(matrix.shape[1]),
+            "n_skills": len(skills.vocabulary),
+        }
+        meta["vocabulary_hash"] = _vocabulary_hash(vectorizer.vocabulary_ or {}, vectorizer.idf_)
+        dense_index = DenseIndex.build(matrix) if (DENSE_ENABLED if dense is None else dense) else None
+        if dense_index is not None:
+            meta["dense"] = dense_index.describe()
+        index = cls(vectorizer, matrix, catalog, meta, skills, dense_index)
+        index.compute_signals()
+        return index
+
+    def compute_signals(self, cluster_base=None):
+        """
+        Precomputes the resume-independent columns with the artifacts the
+        model registry serves for this vocabulary: KMeans labels (int16) and
+        logistic probabilities (float32), recording the artifact versions in
+        meta (kmeans_version / logistic_version) so the request path can
+        check the columns still match. `cluster_base` reuses the centroids
+        of a previous version when its KMeans artifact is still current.
+        Also assigns a new version id.
+        """
+        kmeans_model = model_registry.get("kmeans", self)
+        log_model = model_registry.get("logistic", self)
+        kmeans_version = kmeans_model.meta.get("version", "unversioned") if kmeans_model is not None else None
+        if cluster_base is not None and kmeans_version in (None, cluster_base.model_version):
+            self.clusters = ClusterIndex.build(self.matrix, base=cluster_base)
+        else:
+            self.clusters = ClusterIndex.build(self.matrix, kmeans_model=kmeans_model)
+        self.logistic = _predict_rows(log_model, self.matrix) if log_model is not None else None
+        self._record_signals(log_model.meta.get("version", "unversioned") if log_model is not None else None)
+
+    def carry_signals(self, base, keep_rows, added):
+        """
+        Precomputed columns for an incremental update: the values of rows
+        `keep_rows` of `base` followed by those of `added` (the new TF-IDF
+        rows, last in this index), labelled with base's centroids and scored
+        with the logistic artifact base's column came from. Only the new rows
+        are computed and nothing is fitted. When the registry no longer serves
+        that artifact the logistic column is dropped (stale until `refresh`).
+        Also assigns a new version id.
+        """
+        self.clusters = base.clusters.updated(keep_rows, added) if base.clusters is not None else None
+        log_model = model_registry.get("logistic", self)
+        logistic_version = base.meta.get("logistic_version")
+        if (base.logistic is not None and log_model is not None
+                and log_model.meta.get("version", "unversioned") == logistic_version):
+            self.logistic = np.concatenate([np.asarray(base.logistic)[keep_rows], _predict_rows(log_model, added)])
+        else:
+            self.logistic, logistic_version = None, None
+        self._record_signals(logistic_version)
+
+    def _record_signals(self, logistic_version):
+        self.meta["n_clusters"] = self.clusters.n_clusters if self.clusters is not None else None
+        self.meta["kmeans_version"] = self.clusters.model_version if self.clusters is not None else None
+        self.meta["logistic_version"] = logistic_version
+        self.meta["version"] = _index_version(
+            self.vocabulary_hash, self.matrix, self.meta["kmeans_version"], self.meta["logistic_version"])
+
+    def stale_signals(self):
+        """
+        Invariant check for the precomputed columns: returns the names
+        ("kmeans", "logistic") of those not computed with the artifact the
+        model registry serves now for this vocabulary. Labels from a KMeans
+        fitted at index build stay valid while no artifact exists.
+        """
+        current = model_registry.versions(self)
+        stale = []
+        if self.clusters is None or (current["kmeans"] is not None
+                                     and self.meta.get("kmeans_version") != current["kmeans"]):
+            stale.append("kmeans")
+        if self.meta.get("logistic_version") != current["logistic"]:
+            stale.append("logistic")
+        return stale
+
+    # --------------------------------------------------------
+    # Incremental updates
+    # --------------------------------------------------------
+    def apply_updates(self, upserts=None, retire_ids=(), drift_threshold=IDF_DRIFT_THRESHOLD):
+        """
+        Returns a new index with `upserts` (catalog rows with an "id" or
+        "internship_id"; new ids are appended, known ids replaced) added and
+        `retire_ids` removed. Only the upserted rows are vectorized, with the
+        fitted vocabulary and IDF; no vectorizer, KMeans or model is fitted,
+        so this is safe on the request path. When the resulting IDF drift
+        exceeds `drift_threshold`, meta["refit_needed"] is set (and kept by
+        later updates) until `refit_index` runs offline.
+        This index is left untouched. meta["last_update"] summarizes the change.
+        """
+        upserts, retire_ids = normalize_updates(upserts, retire_ids)
+        if upserts is not None:
+            upserts = normalize_catalog(upserts).drop_duplicates("internship_id", keep="last")
+            if "id" not in self.catalog.columns:
+                upserts = upserts.drop(columns=["id"], errors="ignore")
+            elif "id" not in upserts.columns:
+                upserts["id"] = upserts["internship_id"]
+            upsert_ids = upserts["internship_id"].to_numpy()
+        else:
+            upsert_ids = np.empty(0, dtype=np.int64)
+        retire_ids = np.asarray(retire_ids, dtype=np.int64)
+
+        ids = self.catalog["internship_id"].to_numpy()
+        retired = np.isin(ids, retire_ids)
+        keep = ~(retired | np.isin(ids, upsert_ids))
+        parts = [self.catalog[keep]] + ([upserts] if upserts is not None else [])
+        catalog = pd.concat(parts, ignore_index=True)
+        if catalog.empty:
+            raise ValueError("An index needs at least one internship")
+
+        last_update = {
+            "base_version": self.version,
+            "upserted": int(upsert_ids.shape[0]),
+            "retired": int(retired.sum()),
+        }
+        # Only the upserted rows are vectorized, parsed, labelled and scored;
+        # everything else is sliced from this index by `keep_rows`.
+        keep_rows = np.flatnonzero(keep)
+        if upserts is not None:
+            added = self.transform(upserts[TEXT_COLUMN].astype(str).tolist())
+            skill_lists = upserts["required_skills_list"].tolist()
+        else:
+            added = sparse.csr_matrix((0, self.matrix.shape[1]), dtype=self.matrix.dtype)
+            skill_lists = []
+        matrix = _as_csr(sparse.vstack([self.matrix[keep_rows], added], format="csr"))
+        meta = dict(self.meta)
+        meta.update({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "n_docs": int(matrix.shape[0]),
+        })
+        skills = self.skills.updated(keep_rows, skill_lists, get_skill_matcher().canonicalize)
+        updated = type(self)(self.vectorizer, matrix, catalog, meta, skills)
+        drift = updated.idf_drift()
+        updated.carry_signals(self, keep_rows, added)
+        if self.dense is not None:
+            updated.dense = self.dense.updated(keep_rows, added)
+        if drift > drift_threshold and not meta.get("refit_needed"):
+            logger.warning(
+                "IDF drift %.4f exceeds %.4f; index %s needs an offline refit "
+                "(python -m models.internship_index refit, then python -m models.train kmeans / logistic)",
+                drift, drift_threshold, updated.version)
+        updated.meta["refit_needed"] = bool(meta.get("refit_needed") or drift > drift_threshold)
+        updated.meta["n_skills"] = len(updated.skills.vocabulary)
+        updated.meta["last_update"] = dict(last_update, idf_drift=drift, refit_needed=updated.meta["refit_needed"])
+        return updated
+
+    def idf_drift(self):
+        """
+        Relative L1 distance between the fitted IDF weights and the IDF the
+        current rows imply (document frequencies counted from the matrix).
+        0.0 right after a fit; grows as incremental updates change the catalog.
+        """
+        n_docs, n_features = self.matrix.shape
+        doc_freq = np.bincount(self.matrix.indices, minlength=n_features)
+        smooth = int(getattr(self.vectorizer, "smooth_idf", True))
+        current = np.log((n_docs + smooth) / (doc_freq + smooth)) + 1.0
+        fitted = np.asarray(self.vectorizer.idf_, dtype=np.float64)
+        return float(np.abs(current - fitted).sum() / max(fitted.sum(), 1e-12))
+
+    # --------------------------------------------------------
+    # Querying
+    # --------------------------------------------------------
+    def transform(self, texts):
+        """
+        Vectorizes texts into the index space (no refit).
+        Returns a CSR matrix of shape (len(texts), n_features).
+        """
+        return _as_csr(self.vectorizer.transform(texts))
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+    def save(self, root=INDEX_DIR):
+        """
+        Writes this index as a new version directory under `root` and
+        atomically points `root/CURRENT` at it. Returns the version dir.
+        """
+        os.makedirs(root, exist_ok=True)
+        final_dir = os.path.join(root, self.version)
+        tmp_dir = final_dir + ".tmp-%d" % os.getpid()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        if self.vectorizer.vocabulary_ is not None:  # None in hashing mode
+            vocabulary = {term: int(i) for term, i in self.vectorizer.vocabulary_.items()}
+            with open(os.path.join(tmp_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+                json.dump(vocabulary, f)
+        np.save(os.path.join(tmp_dir, "idf.npy"), np.asarray(self.vectorizer.idf_))
+        np.save(os.path.join(tmp_dir, "matrix_data.npy"), self.matrix.data)
+        np.save(os.path.join(tmp_dir, "matrix_indices.npy"), self.matrix.indices)
+        np.save(os.path.join(tmp_dir, "matrix_indptr.npy"), self.matrix.indptr)
+        self.skills.save(tmp_dir)
+        if self.clusters is not None:
+            self.clusters.save(tmp_dir)
+        if self.logistic is not None:
+            np.save(os.path.join(tmp_dir, "logistic_scores.npy"), self.logistic)
+        if self.dense is not None:
+            self.dense.save(tmp_dir)
+        if arrow_available():
+            write_catalog(self.catalog, os.path.join(tmp_dir, "catalog.arrow"))
+        else:
+            catalog = self.catalog.drop(columns=["required_skills_list"], errors="ignore")
+            catalog.to_csv(os.path.join(tmp_dir, "catalog.csv"), index=False)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+        _write_current(root, self.version)
+        return final_dir
+
+    @classmethod
+    def load(cls, root=INDEX_DIR, version=None, mmap=True):
+        """
+        Loads the CURRENT (or given) index version from `root`.
+        Matrix arrays are memory-mapped copy-on-write when `mmap` is True
+        (pages stay shared; sklearn's Cython kernels need writable buffers).
+        Raises FileNotFoundError when no index has been built yet.
+        """
+        version = version or read_current(root)
+        if not version:
+            raise FileNotFoundError(
+                "Internship index not found in %s. Build it with: "
+                "python -m models.internship_index build" % root
+            )
+        path = os.path.join(root, version)
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError("Unsupported index format %r in %s" % (meta.get("format_version"), path))
+
+        mmap_mode = "c" if mmap else None
+        idf = np.load(os.path.join(path, "idf.npy"))
+        data = np.load(os.path.join(path, "matrix_data.npy"), mmap_mode=mmap_mode)
+        indices = np.load(os.path.join(path, "matrix_indices.npy"), mmap_mode=mmap_mode)
+        indptr = np.load(os.path.join(path, "matrix_indptr.npy"), mmap_mode=mmap_mode)
+        matrix = sparse.csr_matrix(
+            (data, indices, indptr), shape=(meta["n_docs"], meta["n_features"]), copy=False
+        )
+
+        vectorizer = make_vectorizer(meta["vectorizer_params"])
+        if os.path.exists(os.path.join(path, "vocabulary.json")):
+            with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as f:
+                vectorizer.vocabulary_ = json.load(f)
+        vectorizer.idf_ = idf
+        if os.path.exists(os.path.join(path, "catalog.arrow")):
+            catalog = read_catalog(os.path.join(path, "catalog.arrow"), mmap=mmap)
+        else:
+            catalog = normalize_catalog(pd.read_csv(os.path.join(path, "catalog.csv")))
+        skills = SkillIndex.load(path, meta["n_docs"], mmap_mode)
+        dense = DenseIndex.load(path, mmap_mode)
+        clusters = ClusterIndex.load(path, mmap_mode, meta.get("kmeans_version"))
+        logistic_path = os.path.join(path, "logistic_scores.npy")
+        logistic = np.load(logistic_path, mmap_mode=mmap_mode) if os.path.exists(logistic_path) else None
+        return cls(vectorizer, matrix, catalog, meta, skills, dense, clusters, logistic)
+
+
+# ------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------
+def _as_csr(matrix):
+    matrix = sparse.csr_matrix(matrix)
+    matrix.sort_indices()
+    return matrix
+
+
+def _build_skills(catalog):
+    return SkillIndex.build(catalog["required_skills_list"], get_skill_matcher().canonicalize)
+
+
+def _vocabulary_hash(vocabulary, idf):
+    digest = hashlib.sha256()
+    digest.update(json.dumps(sorted((t, int(i)) for t, i in vocabulary.items())).encode("utf-8"))
+    digest.update(np.ascontiguousarray(idf).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def parse_internship_id(value):
+    """
+    Returns `value` as an int internship id ("7", 7 and 7.0 are accepted).
+    Raises ValueError for anything else, including booleans and blanks.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        raise ValueError("Internship ids must be integers, got %r" % (value,))
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)) and np.isfinite(value) and float(value).is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().lstrip("+-").isdigit():
+        return int(value.strip())
+    raise ValueError("Internship ids must be integers, got %r" % (value,))
+
+
+def normalize_updates(upserts=None, retire_ids=()):
+    """
+    Validates catalog changes before they touch an index. Returns
+    (upserts, retire_ids): the upserted rows (dicts or a DataFrame) as a
+    DataFrame whose "internship_id" (and "id", when given) are ints, taken
+    from "internship_id" or else "id", or None when there are none; and
+    the retired ids as a list of ints. Raises ValueError on a missing or
+    non-integer id.
+    """
+    frame = None
+    if upserts is not None and len(upserts):
+        if not isinstance(upserts, pd.DataFrame) and not all(isinstance(row, dict) for row in upserts):
+            raise ValueError("Each upserted internship must be an object")
+        frame = pd.DataFrame(upserts).copy()
+        frame.columns = [str(c).strip() for c in frame.columns]
+        if "internship_id" not in frame.columns and "id" not in frame.columns:
+            raise ValueError("Upserted internships need an 'id' or 'internship_id'")
+        ids = frame["internship_id"] if "internship_id" in frame.columns else frame["id"]
+        if "internship_id" in frame.columns and "id" in frame.columns:
+            ids = ids.where(ids.notna(), frame["id"])
+        frame["internship_id"] = np.asarray([parse_internship_id(v) for v in ids], dtype=np.int64)
+        if "id" in frame.columns:
+            frame["id"] = frame["internship_id"]
+    return frame, [parse_internship_id(v) for v in retire_ids]
+
+
+def _predict_rows(model, matrix, chunk_size=65536):
+    # Row blocks keep predict_proba's dense temporaries small on big catalogs
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], chunk_size):
+        scores[start:start + chunk_size] = model.predict(matrix[start:start + chunk_size])
+    return scores
+
+
+def _index_version(vocabulary_hash, matrix, *model_versions):
+    digest = hashlib.sha256(vocabulary_hash.encode("utf-8"))
+    for arr in (matrix.data, matrix.indices, matrix.indptr):
+        digest.update(np.ascontiguousarray(arr).tobytes())
+    for model_version in model_versions:
+        digest.update(str(model_version).encode("utf-8"))
+    return "v%s-%s" % (time.strftime("%Y%m%d%H%M%S", time.gmtime()), digest.hexdigest()[:12])
+
+
+def read_current(root=INDEX_DIR):
+    """
+    Returns the active version name recorded in `root/CURRENT`, or None.
+    """
+    try:
+        with open(os.path.join(root, "CURRENT"), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_current(root, version):
+    tmp_path = os.path.join(root, "CURRENT.tmp-%d" % os.getpid())
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, "CURRENT"))
+
+
+def prune_versions(root=INDEX_DIR, keep=KEEP_VERSIONS):
+    """
+    Deletes all but the newest `keep` version dirs (never CURRENT).
+    """
+    current = read_current(root)
+    versions = sorted(
+        d for d in os.listdir(root)
+        if d.startswith("v") and os.path.isdir(os.path.join(root, d)) and ".tmp-" not in d
+    )
+    for name in versions[:-keep] if keep else versions:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def build_index(catalog_path=None, root=INDEX_DIR, dense=None, vectorizer_params=None):
+    """
+    Fits a fresh index from the catalog (Arrow copy or CSV, see
+    load_catalog) and makes it CURRENT.
+    """
+    index = InternshipIndex.build(load_catalog(catalog_path), vectorizer_params, dense=dense)
+    index.save(root)
+    prune_versions(root)
+    return index
+
+
+def refit_index(root=INDEX_DIR):
+    """
+    Refits the CURRENT index over its own catalog (including ingested
+    updates) and makes the result CURRENT. Offline only: the new
+    vocabulary invalidates the trained KMeans/logistic artifacts, which
+    then need `python -m models.train` (see missing_models).
+    """
+    with _update_lock:
+        base = InternshipIndex.load(root)
+        index = InternshipIndex.build(base.catalog, base.meta["vectorizer_params"], dense=base.dense is not None)
+        return _publish(index, root)
+
+
+def missing_models(index):
+    """
+    Names of the trained artifacts ("kmeans", "logistic") the model
+    registry does not serve for `index`'s vocabulary.
+    """
+    return [name for name, version in sorted(model_registry.versions(index).items()) if version is None]
+
+
+def refresh_signals(root=INDEX_DIR):
+    """
+    Recomputes the precomputed KMeans/logistic columns of the CURRENT index
+    with the current model artifacts (after `python -m models.train`) and
+    makes the result CURRENT. Returns the index (unchanged when up to date).
+    """
+    with _update_lock:
+        index = InternshipIndex.load(root)
+        if not index.stale_signals():
+            return index
+        index.compute_signals(cluster_base=index.clusters)
+        return _publish(index, root)
+
+
+def update_index(upserts=None, retire_ids=(), root=INDEX_DIR, drift_threshold=IDF_DRIFT_THRESHOLD):
+    """
+    Applies catalog changes to the CURRENT index (see apply_updates),
+    saves the result as a new version and makes it CURRENT. This process
+    switches immediately; other workers within INDEX_POLL_SECONDS.
+    Updates are serialized per process; run one writer at a time.
+    Returns the new index.
+    """
+    with _update_lock:
+        base = InternshipIndex.load(root)  # latest on disk, not this worker's cached copy
+        return _publish(base.apply_updates(upserts, retire_ids, drift_threshold), root)
+
+
+def _publish(index, root):
+    global _index, _index_checked
+    index.save(root)
+    prune_versions(root)
+    loaded = InternshipIndex.load(root, index.version)
+    with _index_lock:
+        _index, _index_checked = loaded, time.monotonic()
+    return loaded
+
+
+# ------------------------------------------------------------
+# Process-wide cached index (loaded once per worker)
+# ------------------------------------------------------------
+_index = None
+_index_checked = 0.0
+_index_lock = threading.Lock()
+_update_lock = threading.Lock()
+
+
+def get_index(root=INDEX_DIR):
+    """
+    Returns the process-wide index, loading it on first use. At most every
+    INDEX_POLL_SECONDS the CURRENT pointer is re-read and a newer version
+    is swapped in; requests already holding the old index finish on it.
+    """
+    global _index, _index_checked
+    if _index is not None and time.monotonic() - _index_checked < INDEX_POLL_SECONDS:
+        return _index
+    with _index_lock:
+        if _index is None or time.monotonic() - _index_checked >= INDEX_POLL_SECONDS:
+            current = read_current(root)
+            if _index is None or (current and current != _index.version):
+                _index = InternshipIndex.load(root, current)
+            _index_checked = time.monotonic()
+    return _index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the persisted internship index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="Fit the TF-IDF index from the catalog CSV")
+    build_cmd.add_argument("--catalog", default=None, help="CSV or .arrow (default: %s)" % CATALOG_PATH)
+    build_cmd.add_argument("--out", default=INDEX_DIR)
+    build_cmd.add_argument("--dense", action="store_true", default=None,
+                           help="also build the SVD + IVF ANN stage (default: INTERNIFY_DENSE)")
+    build_cmd.add_argument("--dtype", choices=["float32", "float64"], default=None)
+    build_cmd.add_argument("--min-df", type=parse_number, default=None,
+                           help="drop terms in fewer documents (int) or a smaller fraction (float)")
+    build_cmd.add_argument("--max-features", type=int, default=None, help="keep the N most frequent terms")
+    build_cmd.add_argument("--hashing", type=int, default=None, metavar="N_FEATURES",
+                           help="hash terms into N columns instead of keeping a vocabulary")
+    update_cmd = sub.add_parser("update", help="Upsert/retire internships in the CURRENT index")
+    update_cmd.add_argument("--upsert", help="CSV of new or changed internships (with an id column)")
+    update_cmd.add_argument("--retire", type=int, nargs="*", default=[], help="internship ids to remove")
+    update_cmd.add_argument("--out", default=INDEX_DIR)
+    refit_cmd = sub.add_parser("refit", help="Refit the CURRENT index over its own catalog")
+    refit_cmd.add_argument("--out", default=INDEX_DIR)
+    refresh_cmd = sub.add_parser("refresh", help="Recompute cluster/logistic columns with the current models")
+    refresh_cmd.add_argument("--out", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        params = default_params(args.dtype, args.min_df, args.max_features, args.hashing)
+        built = build_index(args.catalog, args.out, dense=args.dense, vectorizer_params=params)
+        print("✅ Built index %s (%d internships, %d %s, %s) in %.2fs" % (
+            built.version, built.meta["n_docs"], built.meta["n_features"],
+            "hashed columns" if "hashing_features" in params else "terms", params["dtype"],
+            time.perf_counter() - started))
+    elif args.command == "update":
+        upserts, retire = normalize_updates(pd.read_csv(args.upsert) if args.upsert else None, args.retire)
+        updated = update_index(upserts, retire, args.out)
+        change = updated.meta["last_update"]
+        print("✅ Index %s: %d upserted, %d retired, IDF drift %.4f%s" % (
+            updated.version, change["upserted"], change["retired"], change["idf_drift"],
+            " (refit needed: python -m models.internship_index refit)" if change["refit_needed"] else ""))
+    elif args.command == "refit":
+        updated = refit_index(args.out)
+        print("✅ Refitted index %s (%d internships)" % (updated.version, updated.meta["n_docs"]))
+        missing = missing_models(updated)
+        if missing:
+            print("⚠️ No %s model matches the refitted vocabulary; requests score without it until you run: %s" % (
+                " / ".join(missing), "; ".join("python -m models.train %s" % name for name in missing)))
+    elif args.command == "refresh":
+        updated = refresh_signals(args.out)
+        print("✅ Index %s: kmeans %s, logistic %s" % (
+            updated.version, updated.meta.get("kmeans_version"), updated.meta.get("logistic_version")))
+
+    # The app joins saved matches to the internships table; mirror the new
+    # version now instead of waiting for the next app start.
+    # (Imported here: recommender_pipeline imports this module.)
+    from db_handler import create_tables
+    from recommender_pipeline import sync_internship_catalog
+
+    published = built if args.command == "build" else updated
+    create_tables()
+    if args.command == "update":
+        sync_internship_catalog(published, internship_ids=upserts["internship_id"].tolist() if upserts is not None else [])
+    else:
+        sync_internship_catalog(published)
+    print("✅ Synced internships table to %s" % published.version)
@@ -1,14 +1,23 @@
-import pickle
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+from models.artifacts import load_artifact, save_artifact
+
+KMEANS_MODEL_PATH = "data/model_files/kmeans_model.pkl"
 
 
 class KMeansModel:
     """
     Thin wrapper over scikit-learn KMeans with a simple API used by the pipeline.
     Provides train/predict/save/load methods for consistency with other models.
+    `minibatch=True` uses MiniBatchKMeans (large catalogs).
+    `meta` describes a saved artifact (version, vocabulary_hash, ...).
     """
-    def __init__(self, n_clusters=5):
-        self.model = KMeans(n_clusters=n_clusters, random_state=42)
+    def __init__(self, n_clusters=5, minibatch=False):
+        if minibatch:
+            self.model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3, batch_size=4096)
+        else:
+            self.model = KMeans(n_clusters=n_clusters, random_state=42)
+        self.meta = {}
 
     def train(self, X):
         """
@@ -20,19 +29,22 @@ class KMeansModel:
     def predict(self, X):
         """
         Returns cluster labels for each row in X.
+        X is cast to the centroids' dtype (a model fitted on a float64
+        index can label float32 rows and vice versa).
         """
-        return self.model.predict(X)
+        return self.model.predict(X.astype(self.model.cluster_centers_.dtype, copy=False))
 
-    def save_model(self, path="data/model_files/kmeans_model.pkl"):
+    def save_model(self, path=KMEANS_MODEL_PATH, meta=None):
         """
-        Serializes the fitted KMeans model to disk.
+        Serializes the fitted KMeans model (plus `meta`) to disk; the file
+        is replaced atomically so readers never see a partial artifact.
         """
-        pickle.dump(self.model, open(path, "wb"))
+        self.meta = dict(meta or self.meta)
+        save_artifact(path, self.model, self.meta)
 
-    def load_model(self, path="data/model_files/kmeans_model.pkl"):
+    def load_model(self, path=KMEANS_MODEL_PATH):
         """
         Loads a serialized KMeans model from disk into this instance.
         """
-        self.model = pickle.load(open(path, "rb"))
-
+        self.model, self.meta = load_artifact(path)
 
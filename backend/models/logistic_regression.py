@@ -1,15 +1,20 @@
-import pickle
 from sklearn.linear_model import LogisticRegression
 
+from models.artifacts import load_artifact, save_artifact
+
+LOGISTIC_MODEL_PATH = "data/model_files/logistic_model.pkl"
+
 
 class LogisticModel:
     """
     Thin wrapper around scikit-learn LogisticRegression providing
     a consistent API (train/predict/save/load) for this project.
     The model predicts match probability for feature vectors.
+    `meta` describes a saved artifact (version, vocabulary_hash, ...).
     """
     def __init__(self):
         self.model = LogisticRegression()
+        self.meta = {}
 
     def train(self, X, y):
         """
@@ -26,17 +31,15 @@ class LogisticModel:
         """
         return self.model.predict_proba(X)[:, 1]  # match probability
 
-    def save_model(self, path="data/model_files/logistic_model.pkl"):
+    def save_model(self, path=LOGISTIC_MODEL_PATH, meta=None):
         """
-        Serializes the underlying sklearn model to disk.
+        Serializes the underlying sklearn model (plus `meta`) to disk atomically.
         """
-        pickle.dump(self.model, open(path, "wb"))
+        self.meta = dict(meta or self.meta)
+        save_artifact(path, self.model, self.meta)
 
-    def load_model(self, path="data/model_files/logistic_model.pkl"):
+    def load_model(self, path=LOGISTIC_MODEL_PATH):
         """
         Loads the serialized sklearn model from disk into this instance.
         """
-        self.model = pickle.load(open(path, "rb"))
-
-
-
+        self.model, self.meta = load_artifact(path)
@@ -1,88 +1,148 @@
-import spacy
-from transformers import pipeline
+import logging
+import os
+import threading
+
+from models.internship_index import get_index
+from utils.skill_matcher import get_skill_matcher
+
+logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------------
-# Load NLP models
+# Configuration
 # ------------------------------------------------------------
+# Models are loaded lazily on first use, never at import time, so
+# importing this module (e.g. from the recommender pipeline) is cheap.
+# Set INTERNIFY_NLP_TRANSFORMER=0 to run without the BERT NER pipeline
+# (spaCy entities + keyword skills only; transformers is never imported).
+USE_TRANSFORMER = os.getenv("INTERNIFY_NLP_TRANSFORMER", "1").strip().lower() not in ("0", "false", "no", "off")
+SPACY_MODEL = "en_core_web_sm"
+NER_MODEL = "dslim/bert-base-NER"
 
-# 1️⃣ spaCy small English model → good for tokenization, POS tagging, and basic entities
-nlp_spacy = spacy.load("en_core_web_sm")
 
-# 2️⃣ HuggingFace Transformers NER pipeline
-#     Uses a pretrained BERT model to detect entities like ORG, PERSON, LOC etc.
-ner_model = pipeline(
-    "ner",                               # task type: named-entity recognition
-    model="dslim/bert-base-NER",         # pretrained model name
-    aggregation_strategy="simple"        # merges sub-tokens (e.g. 'New' + 'York' → 'New York')
-)
+class LazyModel:
+    """
+    Thread-safe, load-once holder for an expensive model.
+    The loader runs on the first `get()`; concurrent callers wait on a
+    lock instead of loading twice. If the loader fails (library or model
+    not installed) the failure is logged once and `get()` returns None.
+    """
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
 
-# ------------------------------------------------------------
-# Simple list of common skills
-# (Later we can load this from an external CSV or dataset)
-# ------------------------------------------------------------
-COMMON_SKILLS = [
-    "python", "java", "c++", "sql", "flask", "react", "machine learning",
-    "data analysis", "javascript", "tensorflow", "nlp", "html", "css",
-    "deep learning", "communication", "teamwork"
-]
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._value = self._loader()
+                    except Exception as e:
+                        logger.warning("NLP model %s unavailable: %s", self.name, e)
+                        self._value = None
+                    self._loaded = True
+        return self._value
 
-# ------------------------------------------------------------
-# Function: extract_entities(text)
-# ------------------------------------------------------------
-def extract_entities(text):
+
+def _load_spacy():
+    # spaCy small English model → good for tokenization, POS tagging, and basic entities
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+
+def _load_ner():
+    # HuggingFace Transformers NER pipeline
+    # Uses a pretrained BERT model to detect entities like ORG, PERSON, LOC etc.
+    from transformers import pipeline
+    return pipeline(
+        "ner",                               # task type: named-entity recognition
+        model=NER_MODEL,                     # pretrained model name
+        aggregation_strategy="simple"        # merges sub-tokens (e.g. 'New' + 'York' → 'New York')
+    )
+
+
+spacy_model = LazyModel(SPACY_MODEL, _load_spacy)
+ner_model = LazyModel(NER_MODEL, _load_ner)
+
+
+class NLPParser:
     """
-    Extracts important information from resume text using spaCy + HF NER.
+    Resume NLP front-end used by the recommender pipeline.
+    - vectorize: TF-IDF vectors in the shared internship index space
+    - extract_entities: spaCy (+ optional BERT NER) entities and skills
+    Heavy models are only loaded when extract_entities is first called.
+    """
+    def __init__(self, index=None, use_transformer=None):
+        self._index = index
+        self.use_transformer = USE_TRANSFORMER if use_transformer is None else use_transformer
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = get_index()
+        return self._index
+
+    def vectorize(self, texts):
+        """
+        Transforms texts with the pre-fitted index vectorizer (no refit).
+        Returns a CSR matrix of shape (len(texts), n_features).
+        """
+        return self.index.transform(texts)
+
+    def extract_entities(self, text):
+        """
+        Extracts important information from resume text using spaCy + HF NER.
+
+        Returns a dictionary with:\n
+        - PERSON, ORG, GPE, DATE lists from spaCy/transformers\n
+        - SKILLS from the shared skill taxonomy (utils/skill_matcher.py)\n
+        """
+        # Initialize dictionary for storing extracted data
+        entities = {
+            "PERSON": [],      # candidate name(s)
+            "ORG": [],         # companies or universities
+            "EDUCATION": [],   # (we’ll add manual rules later)
+            "EXPERIENCE": [],  # work experience keywords
+            "SKILLS": [],      # skills list
+            "GPE": [],         # geopolitical entities (locations)
+            "DATE": [],        # dates
+        }
 
-    Returns a dictionary with:\n
-    - PERSON, ORG, GPE, DATE lists from spaCy/transformers\n
-    - SKILLS from a simple keyword list\n
+        # --------------------------------------------------------
+        # A. Named-entity extraction with spaCy
+        # --------------------------------------------------------
+        nlp_spacy = spacy_model.get()
+        if nlp_spacy is not None:
+            doc = nlp_spacy(text)
+            for ent in doc.ents:  # loop over detected entities
+                # ent.label_ gives entity type (e.g. PERSON, ORG, DATE, etc.)
+                if ent.label_ in ["ORG", "PERSON", "GPE", "DATE"]:
+                    entities[ent.label_].append(ent.text)
 
-    Note: The recommender pipeline currently uses a TF-IDF fallback class\n
-    when NLPParser is not present. This module is for richer NLP expansion.
+        # --------------------------------------------------------
+        # B. Extra entity detection with HuggingFace NER model
+        # (BERT is often more accurate than spaCy on named entities)
+        # --------------------------------------------------------
+        ner = ner_model.get() if self.use_transformer else None
+        if ner is not None:
+            for e in ner(text):
+                # We care mainly about organizations and person names here
+                if e['entity_group'] in ["ORG", "PER"]:
+                    entities["ORG"].append(e['word'])
+
+        # --------------------------------------------------------
+        # C. Skill extraction (single pass over the skill taxonomy)
+        # --------------------------------------------------------
+        entities["SKILLS"] = get_skill_matcher().extract(text)
+
+        # Return all extracted information
+        return entities
+
+
+def extract_entities(text):
+    """
+    Module-level shortcut for NLPParser().extract_entities(text).
     """
-    # Run spaCy on the text → returns a Doc object
-    doc = nlp_spacy(text)
-
-    # Initialize dictionary for storing extracted data
-    entities = {
-        "PERSON": [],      # candidate name(s)
-        "ORG": [],         # companies or universities
-        "EDUCATION": [],   # (we’ll add manual rules later)
-        "EXPERIENCE": [],  # work experience keywords
-        "SKILLS": [],      # skills list
-        "GPE": [],         # geopolitical entities (locations)
-        "DATE": [],        # dates
-    }
-
-    # --------------------------------------------------------
-    # A. Named-entity extraction with spaCy
-    # --------------------------------------------------------
-    for ent in doc.ents:  # loop over detected entities
-        # ent.label_ gives entity type (e.g. PERSON, ORG, DATE, etc.)
-        if ent.label_ in ["ORG", "PERSON", "GPE", "DATE"]:
-            entities[ent.label_].append(ent.text)
-
-    # --------------------------------------------------------
-    # B. Extra entity detection with HuggingFace NER model
-    # (BERT is often more accurate than spaCy on named entities)
-    # --------------------------------------------------------
-    hf_entities = ner_model(text)
-    for e in hf_entities:
-        # We care mainly about organizations and person names here
-        if e['entity_group'] in ["ORG", "PER"]:
-            entities["ORG"].append(e['word'])
-
-    # --------------------------------------------------------
-    # C. Skill extraction (simple keyword-based)
-    # --------------------------------------------------------
-    skills_found = []
-    text_lower = text.lower()  # lowercase text for easy matching
-    for skill in COMMON_SKILLS:
-        if skill in text_lower:
-            skills_found.append(skill)
-
-    # Use set() to remove duplicates
-    entities["SKILLS"] = list(set(skills_found))
-
-    # Return all extracted information
-    return entities
+    return NLPParser().extract_entities(text)
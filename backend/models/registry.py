@@ -0,0 +1,149 @@
+# ------------------------------------------------------------
+# registry.py
+# Process-wide registry of trained model artifacts.
+# - Each artifact (data/model_files/*.pkl) is unpickled once per
+#   worker, not per request.
+# - Validation: an artifact is only served for an index whose
+#   vocabulary it was trained on (meta vocabulary_hash, or the input
+#   width for unversioned pickles); otherwise it is treated as missing.
+# - Hot reload: at most every INTERNIFY_MODEL_POLL seconds the file's
+#   (size, mtime) is checked; a changed file is loaded and validated
+#   aside, then swapped in with a single assignment. Artifacts are
+#   written with os.replace (models/artifacts.py), so a reader never
+#   sees a partial file.
+# ------------------------------------------------------------
+
+import logging
+import os
+import threading
+import time
+
+from models.kmeans_model import KMEANS_MODEL_PATH, KMeansModel
+from models.logistic_regression import LOGISTIC_MODEL_PATH, LogisticModel
+
+logger = logging.getLogger(__name__)
+
+MODEL_POLL_SECONDS = float(os.getenv("INTERNIFY_MODEL_POLL", "5"))
+
+
+class _Entry:
+    """
+    One loaded artifact: the model wrapper (or None when the file is
+    missing/unreadable), the file signature it came from and the index
+    vocabulary hashes it was checked against.
+    """
+    def __init__(self, model, signature):
+        self.model = model
+        self.signature = signature
+        self.valid_for = {}
+
+    @property
+    def version(self):
+        if self.model is None:
+            return None
+        return self.model.meta.get("version", "unversioned")
+
+
+class ModelRegistry:
+    """
+    Loads named artifacts once and serves them to every request.
+    `specs` maps a name to (path, factory) where factory() returns an
+    empty model wrapper with load_model(path) and a `meta` dict.
+    """
+    def __init__(self, specs, poll_seconds=MODEL_POLL_SECONDS):
+        self.specs = dict(specs)
+        self.poll_seconds = poll_seconds
+        self._entries = {}
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def load_all(self):
+        """
+        Loads (or re-checks) every artifact now, e.g. at worker start
+        instead of on the first request.
+        """
+        for name in self.specs:
+            self._refresh(name, force=True)
+
+    def get(self, name, index=None):
+        """
+        Returns the model wrapper for `name`, or None when the artifact is
+        missing, unreadable, or (given `index`) trained on another vocabulary.
+        """
+        entry = self._refresh(name)
+        if entry.model is None:
+            return None
+        if index is not None and not self._validate(name, entry, index):
+            return None
+        return entry.model
+
+    def versions(self, index=None):
+        """
+        {name: artifact version or None} for the health endpoint; with
+        `index`, artifacts rejected for its vocabulary report None.
+        """
+        versions = {}
+        for name in self.specs:
+            model = self.get(name, index)
+            versions[name] = model.meta.get("version", "unversioned") if model is not None else None
+        return versions
+
+    # --------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------
+    def _refresh(self, name, force=False):
+        entry = self._entries.get(name)
+        now = time.monotonic()
+        if entry is not None and not force and now - self._checked.get(name, 0.0) < self.poll_seconds:
+            return entry
+        with self._lock:
+            entry = self._entries.get(name)
+            path, factory = self.specs[name]
+            signature = _signature(path)
+            if entry is None or entry.signature != signature:
+                entry = self._load(name, path, factory, signature)
+                self._entries[name] = entry  # atomic swap; in-flight requests keep the old model
+            self._checked[name] = time.monotonic()
+            return entry
+
+    def _load(self, name, path, factory, signature):
+        if signature is None:
+            return _Entry(None, None)
+        model = factory()
+        try:
+            model.load_model(path)
+        except Exception as e:
+            logger.warning("Could not load %s model from %s: %s", name, path, e)
+            return _Entry(None, signature)
+        logger.info("Loaded %s model %s", name, model.meta.get("version", "unversioned"))
+        return _Entry(model, signature)
+
+    def _validate(self, name, entry, index):
+        key = index.vocabulary_hash
+        if key not in entry.valid_for:
+            trained_on = entry.model.meta.get("vocabulary_hash")
+            if trained_on is not None:
+                valid = trained_on == index.vocabulary_hash
+            else:
+                valid = getattr(entry.model.model, "n_features_in_", None) == index.matrix.shape[1]
+            if not valid:
+                # Not index.version: this also runs while a new index is being built
+                logger.warning("Ignoring %s model %s: trained on a different vocabulary than %s "
+                               "(retrain with python -m models.train %s)", name, entry.version, key, name)
+            entry.valid_for[key] = valid
+        return entry.valid_for[key]
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+# Shared by the pipeline, batch scoring and the health endpoint.
+model_registry = ModelRegistry({
+    "logistic": (LOGISTIC_MODEL_PATH, LogisticModel),
+    "kmeans": (KMEANS_MODEL_PATH, KMeansModel),
+})
@@ -0,0 +1,127 @@
+# ------------------------------------------------------------
+# skill_index.py
+# Sparse internship × skill incidence matrix built from the
+# catalog's required_skills, parsed once at index build time.
+# - match_pct: overlap % of a resume's skills for every internship
+#   in one sparse mat-vec (no per-row Python sets).
+# - missing: required skills a resume lacks, for selected rows.
+# ------------------------------------------------------------
+
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+
+class SkillIndex:
+    """
+    Binary CSR matrix (n_internships x n_skills) plus the skill vocabulary
+    and the number of distinct required skills per internship.
+    """
+    def __init__(self, vocabulary, matrix):
+        self.vocabulary = list(vocabulary)
+        self.positions = {skill: i for i, skill in enumerate(self.vocabulary)}
+        self.matrix = matrix
+        self.counts = np.diff(matrix.indptr)
+
+    @classmethod
+    def build(cls, skill_lists, canonicalize=None):
+        """
+        skill_lists: one list of skill names per internship.
+        canonicalize: optional callable mapping a raw name to its canonical
+        form (e.g. SkillMatcher.canonicalize) so synonyms share a column.
+        """
+        positions = {}
+        matrix = _rows(skill_lists, canonicalize, positions)
+        vocabulary = sorted(positions, key=positions.get)
+        return cls(vocabulary, matrix)
+
+    def updated(self, keep_rows, skill_lists, canonicalize=None):
+        """
+        Returns a new index holding rows `keep_rows` of this one followed by
+        one row per entry of `skill_lists`; only those are parsed. New skills
+        are appended to the vocabulary, so existing columns keep their position.
+        """
+        positions = dict(self.positions)
+        added = _rows(skill_lists, canonicalize, positions)
+        kept = self.matrix[keep_rows]
+        kept = sparse.csr_matrix((kept.data, kept.indices, kept.indptr), shape=(kept.shape[0], len(positions)))
+        matrix = sparse.vstack([kept, added], format="csr")
+        return type(self)(sorted(positions, key=positions.get), matrix)
+
+    def vector(self, skills):
+        """
+        Dense 0/1 vector over the skill vocabulary for a list of skills.
+        Skills no internship asks for are ignored.
+        """
+        vec = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for skill in skills:
+            i = self.positions.get(skill)
+            if i is not None:
+                vec[i] = 1.0
+        return vec
+
+    def match_pct(self, skills, rows=None):
+        """
+        Percentage of each internship's required skills covered by `skills`.
+        Returns a float array of length n_internships (0 when none required),
+        or of len(rows) when only the given row indices are scored.
+        """
+        if rows is None:
+            matrix, counts = self.matrix, self.counts
+        else:
+            matrix, counts = self.matrix[rows], self.counts[rows]
+        overlap = matrix.dot(self.vector(skills))
+        return 100.0 * overlap / np.maximum(counts, 1)
+
+    def missing(self, rows, skills):
+        """
+        For each row index in `rows`, the required skills not in `skills`.
+        """
+        have = set(skills)
+        result = []
+        for row in rows:
+            cols = self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+            result.append([self.vocabulary[c] for c in cols if self.vocabulary[c] not in have])
+        return result
+
+    def save(self, path):
+        with open(os.path.join(path, "skill_vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocabulary, f)
+        np.save(os.path.join(path, "skills_indices.npy"), self.matrix.indices)
+        np.save(os.path.join(path, "skills_indptr.npy"), self.matrix.indptr)
+
+    @classmethod
+    def load(cls, path, n_rows, mmap_mode=None):
+        with open(os.path.join(path, "skill_vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        indices = np.load(os.path.join(path, "skills_indices.npy"), mmap_mode=mmap_mode)
+        indptr = np.load(os.path.join(path, "skills_indptr.npy"), mmap_mode=mmap_mode)
+        matrix = sparse.csr_matrix(
+            (np.ones(indices.shape[0], dtype=np.float32), indices, indptr),
+            shape=(n_rows, len(vocabulary)), copy=False,
+        )
+        return cls(vocabulary, matrix)
+
+
+def _rows(skill_lists, canonicalize, positions):
+    """
+    Binary CSR rows for `skill_lists`; unseen skills are added to
+    `positions` (name -> column) in order of first appearance.
+    """
+    indptr = [0]
+    indices = []
+    for skills in skill_lists:
+        row = set()
+        for skill in skills:
+            name = canonicalize(skill) if canonicalize else skill
+            if name:
+                row.add(positions.setdefault(name, len(positions)))
+        indices.extend(sorted(row))
+        indptr.append(len(indices))
+    indices = np.asarray(indices, dtype=np.int32)
+    return sparse.csr_matrix(
+        (np.ones(indices.shape[0], dtype=np.float32), indices, np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(positions)),
+    )
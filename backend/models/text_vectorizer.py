@@ -0,0 +1,106 @@
+# ------------------------------------------------------------
+# text_vectorizer.py
+# TF-IDF representations for the internship index.
+# - vocabulary mode (default): TfidfVectorizer; `min_df` drops terms
+#   seen in fewer documents, `max_features` keeps the most frequent
+#   terms, so rare tokens no longer grow the matrix and the
+#   vocabulary dict.
+# - hashing mode (`hashing_features` > 0): HashingTfidf, tokens hashed
+#   into a fixed number of columns; no vocabulary dict at all, only
+#   the IDF vector is stored. Collisions cost some ranking quality
+#   (see `python -m benchmarks.representation_report`).
+# - `dtype`: float32 (default) halves the CSR data array and every
+#   resume vector; cosine scores differ from float64 by ~1e-7.
+#
+# Settings are stored in the index meta ("vectorizer_params") and
+# rebuilt with make_vectorizer on load; INTERNIFY_TFIDF_* set the
+# defaults for new builds.
+# ------------------------------------------------------------
+
+import os
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+
+
+def parse_number(value):
+    """
+    "2" → 2 (a document count for min_df), "0.001" → 0.001 (a fraction).
+    """
+    value = str(value).strip()
+    return float(value) if "." in value or "e" in value.lower() else int(value)
+
+
+def _env_number(name, default):
+    value = os.getenv(name, "").strip()
+    return parse_number(value) if value else default
+
+
+TFIDF_DTYPE = os.getenv("INTERNIFY_TFIDF_DTYPE", "float32")
+TFIDF_MIN_DF = _env_number("INTERNIFY_TFIDF_MIN_DF", 1)                 # int = documents, float = fraction
+TFIDF_MAX_FEATURES = _env_number("INTERNIFY_TFIDF_MAX_FEATURES", 0)     # 0 = unlimited
+TFIDF_HASHING_FEATURES = _env_number("INTERNIFY_TFIDF_HASHING", 0)      # 0 = vocabulary mode
+
+
+def default_params(dtype=None, min_df=None, max_features=None, hashing_features=None):
+    """
+    Vectorizer params for a new index build (JSON-serializable, stored in
+    meta). Arguments override the INTERNIFY_TFIDF_* defaults; defaults
+    (min_df=1, no max_features) are left out.
+    """
+    params = {"stop_words": "english", "dtype": dtype or TFIDF_DTYPE}
+    hashing_features = TFIDF_HASHING_FEATURES if hashing_features is None else hashing_features
+    if hashing_features:
+        params["hashing_features"] = int(hashing_features)
+        return params
+    min_df = TFIDF_MIN_DF if min_df is None else min_df
+    max_features = TFIDF_MAX_FEATURES if max_features is None else max_features
+    if min_df != 1:
+        params["min_df"] = min_df
+    if max_features:
+        params["max_features"] = int(max_features)
+    return params
+
+
+def make_vectorizer(params):
+    """
+    Unfitted vectorizer for stored `params`. Indexes built before these
+    settings existed have no "dtype" and keep sklearn's float64.
+    """
+    params = dict(params)
+    dtype = np.dtype(params.pop("dtype", "float64"))
+    hashing_features = params.pop("hashing_features", 0)
+    if "ngram_range" in params:
+        params["ngram_range"] = tuple(params["ngram_range"])  # a list after the JSON round trip
+    if hashing_features:
+        return HashingTfidf(hashing_features, dtype=dtype, **params)
+    return TfidfVectorizer(dtype=dtype, **params)
+
+
+class HashingTfidf:
+    """
+    TF-IDF over hashed term counts: HashingVectorizer (raw counts,
+    non-negative) followed by TfidfTransformer (IDF + L2 norm). Exposes
+    the `vocabulary_` (None), `idf_` and `smooth_idf` the index uses.
+    """
+    vocabulary_ = None
+
+    def __init__(self, n_features, dtype=np.float32, **params):
+        self.hasher = HashingVectorizer(n_features=int(n_features), alternate_sign=False, norm=None,
+                                        dtype=dtype, **params)
+        self.transformer = TfidfTransformer()
+        self.smooth_idf = self.transformer.smooth_idf
+
+    @property
+    def idf_(self):
+        return self.transformer.idf_
+
+    @idf_.setter
+    def idf_(self, idf):
+        self.transformer.idf_ = idf
+
+    def fit_transform(self, texts):
+        return self.transformer.fit_transform(self.hasher.transform(texts))
+
+    def transform(self, texts):
+        return self.transformer.transform(self.hasher.transform(texts))
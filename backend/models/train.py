@@ -0,0 +1,88 @@
+# ------------------------------------------------------------
+# train.py
+# Offline training for the KMeans and logistic models.
+# Both are fitted on the persisted index (data/index/CURRENT) and saved
+# as artifacts recording the vocabulary they were trained against
+# (see models/artifacts.py). The request path never trains.
+#
+#   python -m models.train kmeans [--clusters 5] [--minibatch]
+#   python -m models.train logistic --labels data/training/match_labels.csv
+#
+# Logistic labels: CSV with columns internship_id,label (1 = good match).
+# After saving, the index's precomputed cluster/logistic columns are
+# recomputed with the new artifact (skip with --no-refresh and run
+# `python -m models.internship_index refresh` later).
+# ------------------------------------------------------------
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.artifacts import artifact_meta
+from models.internship_index import INDEX_DIR, InternshipIndex, refresh_signals
+from models.kmeans_model import KMEANS_MODEL_PATH, KMeansModel
+from models.logistic_regression import LOGISTIC_MODEL_PATH, LogisticModel
+
+N_CLUSTERS = 5                 # Clusters shown in the results / pie chart
+MINIBATCH_MIN_ROWS = 50000     # Catalogs this large use MiniBatchKMeans by default
+
+
+def train_kmeans(index, n_clusters=N_CLUSTERS, minibatch=None, path=KMEANS_MODEL_PATH):
+    """
+    Fits KMeans (MiniBatchKMeans when `minibatch`, default: large catalogs)
+    on the index matrix and saves the artifact. Returns the model.
+    """
+    if minibatch is None:
+        minibatch = len(index) >= MINIBATCH_MIN_ROWS
+    model = KMeansModel(n_clusters=min(n_clusters, len(index)), minibatch=minibatch)
+    model.train(index.matrix)
+    algorithm = "MiniBatchKMeans" if minibatch else "KMeans"
+    model.save_model(path, artifact_meta("kmeans", index, n_samples=len(index), n_clusters=n_clusters,
+                                         algorithm=algorithm))
+    return model
+
+
+def train_logistic(index, labels_path, path=LOGISTIC_MODEL_PATH):
+    """
+    Fits the logistic model on index rows labelled in `labels_path`
+    (internship_id,label) and saves the artifact. Returns the model.
+    """
+    labels = pd.read_csv(labels_path)
+    positions = pd.Series(np.arange(len(index)), index=index.catalog["internship_id"].to_numpy())
+    labels = labels[labels["internship_id"].isin(positions.index)]
+    if labels["label"].nunique() < 2:
+        raise ValueError("Labels must contain both classes for internships present in the index")
+    rows = positions.loc[labels["internship_id"]].to_numpy()
+    model = LogisticModel()
+    model.train(index.matrix[rows], labels["label"].astype(int).to_numpy())
+    model.save_model(path, artifact_meta("logistic", index, n_samples=int(rows.shape[0])))
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train Internify models on the persisted index.")
+    parser.add_argument("--index", default=INDEX_DIR)
+    parser.add_argument("--no-refresh", action="store_true", help="do not recompute the index columns")
+    sub = parser.add_subparsers(dest="command", required=True)
+    kmeans_cmd = sub.add_parser("kmeans", help="Fit the KMeans cluster model")
+    kmeans_cmd.add_argument("--clusters", type=int, default=N_CLUSTERS)
+    kmeans_cmd.add_argument("--minibatch", action="store_true", default=None)
+    kmeans_cmd.add_argument("--out", default=KMEANS_MODEL_PATH)
+    logistic_cmd = sub.add_parser("logistic", help="Fit the logistic match-probability model")
+    logistic_cmd.add_argument("--labels", required=True, help="CSV with internship_id,label")
+    logistic_cmd.add_argument("--out", default=LOGISTIC_MODEL_PATH)
+    args = parser.parse_args()
+
+    index = InternshipIndex.load(args.index)
+    started = time.perf_counter()
+    if args.command == "kmeans":
+        trained = train_kmeans(index, args.clusters, args.minibatch, args.out)
+    else:
+        trained = train_logistic(index, args.labels, args.out)
+    print("✅ Saved %s to %s in %.2fs" % (trained.meta["version"], args.out, time.perf_counter() - started))
+    if not args.no_refresh:
+        refreshed = refresh_signals(args.index)
+        print("✅ Index %s: kmeans %s, logistic %s" % (
+            refreshed.version, refreshed.meta.get("kmeans_version"), refreshed.meta.get("logistic_version")))
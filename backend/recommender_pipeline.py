@@ -1,150 +1,399 @@
 from models.content_filter import ContentFilter
-from models.logistic_regression import LogisticModel
-from models.kmeans_model import KMeansModel
-try:
-	from models.nlp_parser import NLPParser  # type: ignore
-except Exception:
-	# Fallback lightweight NLP vectorizer if NLPParser is not available
-	from sklearn.feature_extraction.text import TfidfVectorizer
-	class NLPParser:  # type: ignore
-		def __init__(self):
-			self._vectorizer = TfidfVectorizer(stop_words="english")
-		def vectorize(self, texts):
-			# Fit on first call if not fitted; for a single resume + many descriptions,
-			# caller should fit on combined corpus externally. For simplicity, fit on input.
-			return self._vectorizer.fit_transform(texts)
+from models.registry import model_registry
+from models.internship_index import get_index
+from models.dense_index import DENSE_ENABLED, DENSE_CANDIDATES, DENSE_NPROBE
+from models.cluster_index import CLUSTER_PROBE
+from models.nlp_parser import NLPParser
 
 from utils.resume_parser import extract_skills
-from utils.pdf_to_text import extract_text_from_pdf
-from db_handler import save_match, get_connection
-import pandas as pd
+from utils.pdf_to_text import extract_pdf
+from utils.topk import top_k, top_k_per_group
+from utils.result_cache import ResultCache, cache_key, content_hash
+from utils.metrics import StageTimer, CATALOG_SIZE, PDF_PAGES, PDF_PAGES_READ, RESUMES_PROCESSED
+from db_handler import save_matches, save_resume, sync_internships, get_meta, cache_get, cache_put
 import numpy as np
+import io
+import logging
 import os
-from collections import Counter
+from types import SimpleNamespace
 
+logger = logging.getLogger(__name__)
+content_model = ContentFilter()  # stateless; shared by all requests
 
-def process_resume(file_path, user_id):
+
+TOP_K = 5           # Default number of internships returned per resume
+MAX_K = 100         # Upper bound accepted from API callers
+GROUP_BY_COLUMNS = ("cluster", "company")
+# Final score blend: content similarity + logistic probability + skill overlap (as a fraction)
+SCORE_WEIGHTS = {"similarity": 0.5, "logistic": 0.3, "skills": 0.2}
+NO_CLUSTER = -1     # "cluster" value when no KMeans labels/model are available
+# Each run replaces the user's previous matches; INTERNIFY_KEEP_MATCH_HISTORY=1 keeps every run.
+KEEP_MATCH_HISTORY = os.getenv("INTERNIFY_KEEP_MATCH_HISTORY", "0").strip().lower() in ("1", "true", "yes", "on")
+
+# Result cache: in-memory LRU per process; INTERNIFY_CACHE_PERSIST=1 adds the
+# SQLite tier (result_cache table) shared by all workers.
+CACHE_SIZE = int(os.getenv("INTERNIFY_CACHE_SIZE", "256"))
+CACHE_PERSIST = os.getenv("INTERNIFY_CACHE_PERSIST", "0").strip().lower() in ("1", "true", "yes", "on")
+result_cache = ResultCache(
+	max_entries=CACHE_SIZE,
+	store=SimpleNamespace(get=cache_get, put=cache_put) if CACHE_PERSIST else None,
+)
+
+
+def process_resume(resume, user_id, k=TOP_K, group_by=None, per_group_k=1, use_cache=True, digest=None):
 	"""
 	Full pipeline:
-	1. Convert resume PDF → text
-	2. Extract skills
-	3. Vectorize using NLP
-	4. Run models → get scores
-	5. Save results to DB
-	6. Return top N internships
+	1. Load the pre-built internship index
+	2. Convert resume PDF → text
+	3. Extract skills
+	4. Vectorize using NLP
+	5-7. Run models → get scores → blend
+	8. Save results to DB (replacing the user's previous run) and return top K internships
+
+	Parsed resumes and top-K results are cached by the SHA-256 of the PDF
+	bytes plus index/model versions, so re-uploads skip steps 2-7.
+	Each step is timed into the internify_stage_seconds histogram (GET /metrics).
 
 	Parameters
 	----------
-	file_path : str
-		Path to the uploaded resume PDF.
+	resume : str, bytes or binary file-like
+		The resume PDF: a path, raw bytes, or a seekable stream (e.g. the
+		spooled upload stream); nothing is written to disk.
 	user_id : int
 		ID of the user (foreign key for matches table).
+	k : int
+		Number of internships to return (and persist).
+	group_by : str, optional
+		"cluster" or "company" to cap how many results a single group may
+		contribute; at most `per_group_k` rows per group are kept.
+	per_group_k : int
+		Per-group cap used when `group_by` is set.
+	use_cache : bool
+		Set False to bypass the result cache.
+	digest : str, optional
+		SHA-256 hex of the PDF bytes when the caller already computed it.
 
 	Returns
 	-------
 	pandas.DataFrame
-		Top-N internships with columns: title, final_score, cluster.
+		Top-K internships with columns: title, final_score, cluster.
+		`attrs["run_id"]` holds the id of the persisted match run and
+		`attrs["cache"]` is "hit", "partial" (parsed resume reused) or "miss";
+		`attrs["timings"]` maps each stage run to its milliseconds.
 	"""
+	if group_by is not None and group_by not in GROUP_BY_COLUMNS:
+		raise ValueError(f"group_by must be one of {GROUP_BY_COLUMNS}")
 
-	# Step 1 — convert resume to text
-	# Read the PDF and convert to a single string.
-	resume_text = extract_text_from_pdf(file_path)
+	# Step 1 — load internship index
+	# Pre-fitted TF-IDF vocabulary + catalog matrix, built offline and memory-mapped
+	# once per process (python -m models.internship_index build).
+	timer = StageTimer()
+	index = get_index()
+	CATALOG_SIZE.set(len(index))
+	timer.lap("index")
 
-	# Step 2 — extract skills (from resume_parser)
-	# Basic keyword-based skill extraction; can be replaced with advanced NLP later.
-	skills = extract_skills(resume_text)
+	# The upload's SHA-256 keys both cache levels.
+	stream, owned = _open_resume(resume)
+	try:
+		digest = digest or content_hash(stream)
+		resume_key = cache_key("resume", digest, index.version)
+		retrieval = f"dense:{DENSE_NPROBE}:{DENSE_CANDIDATES}" if DENSE_ENABLED else f"clusters:{CLUSTER_PROBE}"
+		results_key = cache_key(resume_key, _model_versions(index), retrieval, k, group_by, per_group_k)
 
-	# Step 3 — load internships data
-	# Source CSV containing title/description/skills for retrieval and scoring.
-	internships_path = "data/internships.csv"
-	if not os.path.exists(internships_path):
-		raise FileNotFoundError("Internships CSV not found.")
-	internships_df = pd.read_csv(internships_path)
-	# Normalize column names: trim whitespace to handle accidental leading/trailing spaces
-	internships_df.columns = [str(c).strip() for c in internships_df.columns]
-	# Normalize optional link/url columns if present
-	for link_col in ["link", "url", "apply_link", "apply_url", "application_link"]:
-		if link_col in internships_df.columns:
-			if link_col != "link":
-				internships_df.rename(columns={link_col: "link"}, inplace=True)
-			break
-	# Normalize required skills list per internship for missing-skill analysis
-	internships_df["required_skills"] = internships_df["required_skills"].astype(str)
-	internships_df["required_skills_list"] = internships_df["required_skills"].apply(
-		lambda s: [x.strip().lower() for x in s.split(",") if x.strip()]
-	)
+		results = result_cache.get(results_key) if use_cache else None
+		if results is not None:
+			cache_status = "hit"
+			timer.lap("cache")
+		else:
+			parsed = result_cache.get(resume_key) if use_cache else None
+			cache_status = "partial" if parsed is not None else "miss"
+			timer.lap("cache")
+			if parsed is None:
+				parsed = _parse_resume(stream, index, timer)
+				if use_cache:
+					result_cache.put(resume_key, parsed)
+					timer.lap("cache")
+			# Keep the parsed text so batch re-matching (batch_match.py) can reuse it
+			save_resume(user_id, parsed["text"], ",".join(parsed["skills"]))
+			timer.lap("persist")
+			results = _rank_internships(index, parsed, k, group_by, per_group_k, timer)
+			if use_cache:
+				result_cache.put(results_key, results)
+				timer.lap("cache")
+	finally:
+		if owned:
+			stream.close()
+
+	# Step 8 — save top results in DB
+	# Persist best matches for the user as one run, replacing the previous
+	# run in the same transaction (unless KEEP_MATCH_HISTORY).
+	run_id = save_matches(user_id, zip(
+		results["internship_id"].astype(int).tolist(),
+		results["final_score"].astype(float).tolist(),
+		results["cluster"].astype(int).tolist(),
+	), replace=not KEEP_MATCH_HISTORY)
+	timer.lap("persist")
+	timer.finish()
+	RESUMES_PROCESSED.inc(cache=cache_status)
+
+	results = results.copy()  # never hand out (or annotate) the cached frame
+	results.attrs["run_id"] = run_id
+	results.attrs["cache"] = cache_status
+	results.attrs["timings"] = timer.timings
+	return results
+
+
+def _open_resume(resume):
+	"""
+	Returns (seekable binary stream, owned) for a path, bytes or stream.
+	`owned` streams were opened here and must be closed by the caller.
+	"""
+	if isinstance(resume, (bytes, bytearray, memoryview)):
+		return io.BytesIO(resume), True
+	if hasattr(resume, "read"):
+		resume.seek(0)
+		return resume, False
+	return open(resume, "rb"), True
+
+
+def _parse_resume(stream, index, timer):
+	"""
+	Steps 2-4: PDF text, skills and the resume's TF-IDF vector, each
+	lapped on `timer`. Returns a dict suitable for caching.
+	"""
+	# Step 2 — convert resume to text
+	# Read the PDF (PyMuPDF, else PyPDF2) up to the page/character caps.
+	pdf = extract_pdf(stream)
+	resume_text = pdf.text
+	PDF_PAGES.observe(pdf.pages)
+	PDF_PAGES_READ.inc(pdf.pages)
+	timer.lap("pdf_to_text")
+
+	# Step 3 — extract skills (from resume_parser)
+	# Single-pass taxonomy matching; returns canonical skill names.
+	skills = extract_skills(resume_text)
 	resume_skills = [x.strip().lower() for x in (skills or []) if str(x).strip()]
-	def _skill_match(lst):
-		try:
-			if not lst:
-				return 0.0
-			return 100.0 * len(set(resume_skills) & set(lst)) / max(1, len(lst))
-		except Exception:
-			return 0.0
-	internships_df["skill_match_pct"] = internships_df["required_skills_list"].apply(_skill_match)
+	timer.lap("skills")
 
 	# Step 4 — vectorize
-	# Fit vectorizer on combined corpus ([resume] + all descriptions) to ensure a shared space.
-	nlp = NLPParser()
-	# For stable similarity, fit vectorizer on combined corpus then transform separately
-	descriptions = internships_df["description"].astype(str).tolist()
-	corpus = [resume_text] + descriptions
-	corpus_vectors = nlp.vectorize(corpus)
-	resume_vector = corpus_vectors[0]
-	internship_vectors = corpus_vectors[1:]
-
-	# Step 5 — load models
-	# ContentFilter: cosine similarity; Logistic/KMeans: loaded from pickles when available.
-	content_model = ContentFilter()
-	log_model = LogisticModel()
-	kmeans_model = KMeansModel()
-
-	# Try loading persisted models; if missing, fall back gracefully
-	try:
-		log_model.load_model("data/model_files/logistic_model.pkl")
-		logistic_available = True
-	except Exception:
-		logistic_available = False
+	# Only the resume is transformed; internship vectors come from the index.
+	nlp = NLPParser(index)
+	resume_vector = nlp.vectorize([resume_text])
+	timer.lap("vectorize")
+	return {"text": resume_text, "skills": resume_skills, "vector": resume_vector, "pages": pdf.pages}
 
-	try:
-		kmeans_model.load_model("data/model_files/kmeans_model.pkl")
-		kmeans_available = True
-	except Exception:
-		# Train KMeans on-the-fly if no pickle exists
-		kmeans_model.train(internship_vectors)
-		kmeans_available = True
+
+def _rank_internships(index, parsed, k, group_by, per_group_k, timer):
+	"""
+	Steps 5-7: score the catalog (or the ANN / nearest-cluster candidates)
+	against a parsed resume and materialize the top-K rows, each step
+	lapped on `timer`.
+	"""
+	resume_skills = parsed["skills"]
+	resume_vector = parsed["vector"]
+
+	# Step 5 — load models and precomputed signals
+	# Logistic probabilities (float32) and KMeans labels (int16) depend only on the
+	# internships, so they are computed at index build; only the cosine term below
+	# depends on the resume. Columns from older model artifacts are scored live.
+	content_model, log_model, kmeans_model = load_models(index)
+	logistic, labels = precomputed_signals(index)
+	if labels is None and kmeans_model is None:
+		# Never train inside a request: results get NO_CLUSTER until
+		# `python -m models.train kmeans` has produced a matching artifact.
+		_warn_once("kmeans", "KMeans model unavailable for index %s; returning cluster %d. "
+					"Train it with: python -m models.train kmeans", index.version, NO_CLUSTER)
+	timer.lap("load_models")
+
+	# Candidate stage — INTERNIFY_DENSE: IVF over SVD vectors proposes DENSE_CANDIDATES rows;
+	# INTERNIFY_CLUSTER_PROBE=N: only rows of the resume's N nearest KMeans clusters.
+	# Candidates are re-ranked exactly below; otherwise every row is scored.
+	rows = _candidate_rows(index, resume_vector)
+	internship_vectors = index.matrix if rows is None else index.matrix[rows]
 
 	# Step 6 — predictions
-	# Similarity: [0,1], Logistic: match probability (if available), KMeans: cluster id per internship.
-	similarity_scores = content_model.get_similarity(resume_vector, internship_vectors)
-	logistic_probs = log_model.predict(internship_vectors) if logistic_available else np.zeros(internship_vectors.shape[0])
-	clusters = kmeans_model.predict(internship_vectors) if kmeans_available else np.zeros(internship_vectors.shape[0], dtype=int)
+	# Similarity: [0,1] over the scored rows; Logistic: match probability (precomputed column,
+	# else the live model, else 0). Skill overlap is one sparse mat-vec over the pre-parsed
+	# internship × skill incidence matrix.
+	n_internships = internship_vectors.shape[0]
+	similarity_scores = content_model.get_similarity(resume_vector, internship_vectors, normalized=True)
+	if logistic is not None:
+		logistic_probs = logistic if rows is None else logistic[rows]
+	elif log_model is not None:
+		logistic_probs = log_model.predict(internship_vectors)
+	else:
+		logistic_probs = np.zeros(n_internships, dtype=np.float32)
+	skill_match_pct = index.skills.match_pct(resume_skills, rows)
+	timer.lap("predict")
 
 	# Step 7 — combine score
-	# Weighted blend: content similarity (0.5) + logistic probability (0.3).
-	# Remaining weight can be used later for additional signals (e.g., skill overlap, recency).
-	final_scores = 0.5 * similarity_scores + 0.3 * logistic_probs
-	internships_df["final_score"] = final_scores
-	internships_df["cluster"] = clusters
+	# Weighted blend: content similarity (0.5) + logistic probability (0.3) + skill overlap (0.2).
+	final_scores = (
+		SCORE_WEIGHTS["similarity"] * similarity_scores
+		+ SCORE_WEIGHTS["logistic"] * logistic_probs
+		+ SCORE_WEIGHTS["skills"] * (skill_match_pct / 100.0)
+	)
 
-	# Step 8 — save top results in DB
-	# Persist best matches for the user. internship_id uses DataFrame index as ID placeholder.
-	top_results = internships_df.sort_values(by="final_score", ascending=False).head(5)
-	for _, row in top_results.iterrows():
-		save_match(user_id, row.name, float(row["final_score"]), int(row["cluster"]))
+	# Top-K selection with argpartition; only the K winners are materialized as rows.
+	# Grouping by cluster without labels or a KMeans model degrades to plain top-K.
+	clusters = None
+	if group_by == "cluster":
+		if labels is not None:
+			clusters = labels if rows is None else labels[rows]
+		elif kmeans_model is not None:
+			clusters = kmeans_model.predict(internship_vectors)
+	if clusters is not None:
+		top_idx = top_k_per_group(final_scores, clusters, k, per_group_k)
+	elif group_by == "company":
+		companies = index.catalog["company"].astype(str).to_numpy()
+		top_idx = top_k_per_group(final_scores, companies if rows is None else companies[rows], k, per_group_k)
+	else:
+		top_idx = top_k(final_scores, k)
+	# Positions in the scored rows → catalog rows
+	catalog_idx = top_idx if rows is None else rows[top_idx]
+
+	top_results = index.catalog.iloc[catalog_idx].copy()
+	top_results["final_score"] = final_scores[top_idx]
+	if clusters is not None:
+		top_results["cluster"] = clusters[top_idx]
+	elif labels is not None:
+		top_results["cluster"] = labels[catalog_idx]
+	elif kmeans_model is not None and len(top_idx):
+		top_results["cluster"] = kmeans_model.predict(internship_vectors[top_idx])
+	else:
+		top_results["cluster"] = NO_CLUSTER
+	top_results["skill_match_pct"] = skill_match_pct[top_idx]
+	top_results["missing_skills"] = index.skills.missing(catalog_idx, resume_skills)
 
 	# Return core columns plus optional link when available
-	cols = ["company", "title", "final_score", "cluster", "skill_match_pct"]
+	cols = ["internship_id", "company", "title", "final_score", "cluster", "skill_match_pct", "missing_skills"]
 	if "link" in top_results.columns:
 		cols.append("link")
+	timer.lap("blend")
 	return top_results[cols]
 
 
+def _candidate_rows(index, resume_vector):
+	"""
+	Row indices proposed by the dense ANN stage or the nearest KMeans
+	clusters, or None to score the whole catalog (both off / not built,
+	catalog small enough, or the probed clusters too small).
+	"""
+	if DENSE_ENABLED and index.dense is not None and len(index) > DENSE_CANDIDATES:
+		return index.dense.search(resume_vector, DENSE_CANDIDATES, DENSE_NPROBE)
+	if CLUSTER_PROBE and index.clusters is not None:
+		return index.clusters.candidates(resume_vector)
+	return None
+
+
+def load_models(index=None):
+	"""
+	ContentFilter: cosine similarity; Logistic/KMeans: shared instances from the
+	process-wide model registry (loaded once, validated against the index vocabulary).
+	Returns (content_model, log_model or None, kmeans_model or None).
+	"""
+	index = index or get_index()
+	return content_model, model_registry.get("logistic", index), model_registry.get("kmeans", index)
+
+
+def precomputed_signals(index):
+	"""
+	Returns (logistic, labels): the index's precomputed logistic probabilities
+	and KMeans labels, with None for a column that fails the invariant check
+	(computed with another artifact than the registry serves now; logged once).
+	"""
+	stale = index.stale_signals()
+	if stale:
+		_warn_once(("stale", index.version), "Index %s has %s columns from older models; scoring them live. "
+					"Refresh with: python -m models.internship_index refresh", index.version, "/".join(stale))
+	logistic = index.logistic if "logistic" not in stale else None
+	labels = index.clusters.labels if "kmeans" not in stale else None
+	return logistic, labels
+
+
+_warned = set()
+
+
+def _warn_once(key, message, *args):
+	if key not in _warned:
+		_warned.add(key)
+		logger.warning(message, *args)
+
+
+def _model_versions(index):
+	"""
+	Cache-key token for the logistic/KMeans artifacts serving this index.
+	"""
+	versions = model_registry.versions(index)
+	return ":".join(str(versions[name]) for name in sorted(versions))
+
+
+def results_payload(results_df, timings=False):
+	"""
+	JSON-ready response body for a process_resume result (shared by the
+	synchronous endpoint and background jobs). With `timings`, adds the
+	per-stage milliseconds as "timings".
+	"""
+	payload = {
+		"message": "Resume processed successfully",
+		"run_id": results_df.attrs.get("run_id"),
+		"cache": results_df.attrs.get("cache"),
+		"results": results_df.to_dict(orient="records"),
+	}
+	if timings:
+		payload["timings"] = results_df.attrs.get("timings")
+	return payload
+
+
+def sync_internship_catalog(index=None, internship_ids=None):
+	"""
+	Mirrors the index's catalog rows into the internships table so saved
+	matches join to real internships. Runs once per index version.
+	`internship_ids` limits the write to changed rows when the table already
+	mirrors the version the index was updated from (incremental ingestion).
+	Retired internships stay in the table so match history keeps its rows.
+	Returns True when rows were written.
+	"""
+	index = index or get_index()
+	synced = get_meta("internships_version")
+	if synced == index.version:
+		return False
+	catalog = index.catalog
+	base_version = index.meta.get("last_update", {}).get("base_version")
+	if internship_ids is not None and synced is not None and synced == base_version:
+		catalog = catalog[catalog["internship_id"].isin(list(internship_ids))]
+	def _col(name):
+		if name in catalog.columns:
+			return catalog[name].fillna("").astype(str).tolist()
+		return [""] * len(catalog)
+	rows = list(zip(
+		catalog["internship_id"].astype(int).tolist(),
+		_col("company"), _col("title"), _col("description"), _col("required_skills"), _col("link"),
+	))
+	sync_internships(rows, index.version)
+	return True
+
+
 # optional test
 if __name__ == "__main__":
-	dummy_user_id = 1
-	dummy_file = "data/resumes/sample_resume.pdf"
-	result = process_resume(dummy_file, dummy_user_id)
-	print(result)
+	import argparse
+	from utils.profiling import PROFILE_DIR, format_summary, profile_call
+
+	parser = argparse.ArgumentParser(description="Run the matching pipeline on one resume PDF.")
+	parser.add_argument("resume", nargs="?", default="data/resumes/sample_resume.pdf")
+	parser.add_argument("--user-id", type=int, default=1)
+	parser.add_argument("--k", type=int, default=TOP_K)
+	parser.add_argument("--profile", action="store_true",
+						help="run under cProfile + tracemalloc (cache bypassed) and print the top functions")
+	parser.add_argument("--request-id", default=None, help="artifact name under %s (default: random)" % PROFILE_DIR)
+	args = parser.parse_args()
+
+	if args.profile:
+		result, summary = profile_call(process_resume, args.resume, args.user_id, k=args.k, use_cache=False,
+									   request_id=args.request_id)
+		print(result)
+		print(format_summary(summary))
+	else:
+		print(process_resume(args.resume, args.user_id, k=args.k))
 
 
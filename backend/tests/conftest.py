@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Modules import each other as top-level packages (run from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs a test in an empty scratch directory with its own SQLite
+    database and index root (data/ paths are cwd-relative), and no
+    process-wide index or cached results carried over between tests.
+    """
+    import db_handler
+    import recommender_pipeline
+    from models import internship_index
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db_handler, "DB_PATH", str(tmp_path / "database" / "internify.db"))
+    monkeypatch.setattr(internship_index, "_index", None)
+    recommender_pipeline.result_cache.clear()
+    db_handler.create_tables()
+    yield tmp_path
+    db_handler.close_connection()
@@ -0,0 +1,32 @@
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog
+from models.cluster_index import ClusterIndex
+from models.dense_index import DenseIndex
+from models.internship_index import InternshipIndex, _build_skills
+from utils.catalog import normalize_catalog
+
+
+def _row_skills(skills, row):
+    cols = skills.matrix.indices[skills.matrix.indptr[row]:skills.matrix.indptr[row + 1]]
+    return {skills.vocabulary[c] for c in cols}
+
+
+def test_incremental_update_matches_full_recompute(workdir):
+    index = InternshipIndex.build(normalize_catalog(synthetic_catalog(300, seed=0)), dense=True)
+    upserts = synthetic_catalog(3, seed=9)
+    upserts["id"] = [5, 10_000, 10_001]
+
+    updated = index.apply_updates(upserts, retire_ids=[7])
+
+    assert len(updated) == 300 + 2 - 1
+    assert updated.skills.vocabulary[:len(index.skills.vocabulary)] == index.skills.vocabulary
+    full_skills = _build_skills(updated.catalog)
+    assert all(_row_skills(updated.skills, r) == _row_skills(full_skills, r) for r in range(len(updated)))
+    full_clusters = ClusterIndex.build(updated.matrix, base=index.clusters)
+    np.testing.assert_array_equal(updated.clusters.labels, full_clusters.labels)
+    np.testing.assert_array_equal(updated.clusters.offsets, full_clusters.offsets)
+    full_dense = DenseIndex.build(updated.matrix, base=index.dense)
+    np.testing.assert_allclose(updated.dense.vectors, full_dense.vectors, atol=1e-5)
+    np.testing.assert_array_equal(updated.dense.order, full_dense.order)
+    assert updated.version != index.version
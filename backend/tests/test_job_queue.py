@@ -0,0 +1,48 @@
+import threading
+
+import db_handler
+from job_queue import JobQueue
+
+
+def _status(job_id):
+    return db_handler.get_job(job_id)[2]
+
+
+def _age_job(job_id, seconds):
+    with db_handler.transaction() as conn:
+        conn.execute(
+            "UPDATE jobs SET started_at = datetime('now', ?), heartbeat_at = datetime('now', ?) WHERE id = ?",
+            (f"-{seconds} seconds", f"-{seconds} seconds", job_id))
+
+
+def test_running_job_keeps_its_claim_while_beating(workdir):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def handler(user_id, payload, params):
+        calls.append(user_id)
+        started.set()
+        release.wait(10)
+        return {}
+
+    queue = JobQueue(handler, workers=1, poll_interval=0.01, heartbeat_interval=0.05, stale_seconds=60)
+    job_id = queue.submit(1, b"")
+    try:
+        assert started.wait(5)
+        _age_job(job_id, 3600)  # claimed long ago; the heartbeat must keep it owned
+        threading.Event().wait(0.3)
+        assert _status(job_id) == "running"
+    finally:
+        release.set()
+        queue.stop(timeout=5)
+    assert calls == [1]
+    assert _status(job_id) == "done"
+
+
+def test_job_without_heartbeat_is_requeued(workdir):
+    db_handler.enqueue_job("orphan", 1, "{}", b"")
+    assert db_handler.claim_job()[0] == "orphan"
+    _age_job("orphan", 3600)  # its worker died long ago
+
+    assert db_handler.requeue_stale_jobs(60) == 1
+    assert _status("orphan") == "queued"
@@ -0,0 +1,90 @@
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+import db_handler
+import recommender_pipeline
+from benchmarks.synthetic import synthetic_catalog, synthetic_resume_pdf
+from models.internship_index import InternshipIndex
+from utils.catalog import normalize_catalog
+
+USER_ID = 1
+
+
+@pytest.fixture
+def resume_pdf(workdir):
+    pytest.importorskip("fitz")
+    InternshipIndex.build(normalize_catalog(synthetic_catalog(200, seed=0))).save()
+    return synthetic_resume_pdf(seed=1)
+
+
+def _stored_runs(user_id):
+    conn = db_handler.get_connection()
+    runs = [row[0] for row in conn.execute("SELECT id FROM match_runs WHERE user_id = ? ORDER BY id", (user_id,))]
+    matches = conn.execute("SELECT COUNT(*) FROM matches WHERE user_id = ?", (user_id,)).fetchone()[0]
+    return runs, matches
+
+
+def _lock_first_commit(monkeypatch):
+    """
+    Makes the first db_handler transaction fail with "database is locked"
+    at commit, after its body ran (and read its rows). Returns the list
+    of attempts.
+    """
+    real_transaction = db_handler.transaction
+    attempts = []
+
+    @contextmanager
+    def locked_once():
+        attempts.append(1)
+        with real_transaction() as conn:
+            yield conn
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db_handler, "transaction", locked_once)
+    return attempts
+
+
+def test_second_run_replaces_previous_run(resume_pdf):
+    recommender_pipeline.process_resume(resume_pdf, USER_ID)
+    second = recommender_pipeline.process_resume(resume_pdf, USER_ID)
+
+    assert second.attrs["cache"] == "hit"
+    runs, matches = _stored_runs(USER_ID)
+    assert runs == [second.attrs["run_id"]]
+    assert matches == len(second)
+
+
+def test_keep_match_history_appends_runs(resume_pdf, monkeypatch):
+    monkeypatch.setattr(recommender_pipeline, "KEEP_MATCH_HISTORY", True)
+    first = recommender_pipeline.process_resume(resume_pdf, USER_ID)
+    second = recommender_pipeline.process_resume(resume_pdf, USER_ID)
+
+    runs, matches = _stored_runs(USER_ID)
+    assert runs == [first.attrs["run_id"], second.attrs["run_id"]]
+    assert matches == len(first) + len(second)
+
+
+def test_locked_save_is_retried_with_every_row(resume_pdf, monkeypatch):
+    first = recommender_pipeline.process_resume(resume_pdf, USER_ID)
+
+    attempts = _lock_first_commit(monkeypatch)
+    second = recommender_pipeline.process_resume(resume_pdf, USER_ID)
+
+    assert len(attempts) == 2
+    runs, matches = _stored_runs(USER_ID)
+    assert runs == [second.attrs["run_id"]]
+    assert matches == len(first) == len(second)
+
+
+def test_locked_catalog_sync_is_retried_with_every_row(workdir, monkeypatch):
+    index = InternshipIndex.build(normalize_catalog(synthetic_catalog(50, seed=0)))
+    attempts = _lock_first_commit(monkeypatch)
+    assert recommender_pipeline.sync_internship_catalog(index)
+
+    conn = db_handler.get_connection()
+    assert len(attempts) == 2
+    assert conn.execute("SELECT COUNT(*) FROM internships").fetchone()[0] == len(index)
+    assert db_handler.get_meta("internships_version") == index.version
@@ -0,0 +1,144 @@
+import argparse
+import os
+import pandas as pd
+
+# -------------------------------------------------------------
+# Internship catalog loading
+# -------------------------------------------------------------
+# Reads the internships CSV and applies the column normalization the
+# pipeline relies on (trimmed headers, a single "link" column, a
+# pre-split "required_skills_list" and an integer "internship_id").
+# Used when building the index.
+#
+# The normalized catalog can be stored as an uncompressed Arrow IPC
+# (Feather v2) file: loading it memory-maps the file instead of parsing
+# text, and the columns stay backed by the mapped pages, which the OS
+# shares read-only between workers. Requires pyarrow; without it the
+# CSV path is used.
+#
+# Convert with:  python -m utils.catalog convert
+# -------------------------------------------------------------
+
+CATALOG_PATH = "data/internships.csv"  # Default source catalog
+CATALOG_ARROW_PATH = "data/internships.arrow"  # Columnar copy written by `convert`
+LINK_COLUMNS = ["link", "url", "apply_link", "apply_url", "application_link"]
+
+
+def normalize_catalog(df):
+    """
+    Normalizes a raw catalog DataFrame in place and returns it:
+    - trims whitespace around column names
+    - renames the first known link/url column to "link"
+    - adds "required_skills_list" (lowercased, stripped skill names)
+    - adds "internship_id": the catalog's own "id" column when present,
+      otherwise the 1-based row number (stable primary key for the DB)
+    """
+    df.columns = [str(c).strip() for c in df.columns]
+    for link_col in LINK_COLUMNS:
+        if link_col in df.columns:
+            if link_col != "link":
+                df.rename(columns={link_col: "link"}, inplace=True)
+            break
+    if "required_skills" not in df.columns:
+        df["required_skills"] = ""
+    df["required_skills"] = df["required_skills"].fillna("").astype(str)
+    df["required_skills_list"] = df["required_skills"].apply(split_skills)
+    if "description" not in df.columns:
+        df["description"] = ""
+    df["description"] = df["description"].fillna("").astype(str)
+    if "internship_id" not in df.columns:
+        df["internship_id"] = df["id"] if "id" in df.columns else range(1, len(df) + 1)
+    df["internship_id"] = df["internship_id"].astype("int64")
+    return df
+
+
+def split_skills(value):
+    """
+    Splits a comma-separated skills string into a list of lowercased names.
+    """
+    return [x.strip().lower() for x in str(value).split(",") if x.strip()]
+
+
+def arrow_available():
+    """
+    True when pyarrow is installed (columnar catalog support).
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def write_catalog(df, path=CATALOG_ARROW_PATH):
+    """
+    Writes a normalized catalog as an uncompressed Arrow IPC file (so it
+    can be memory-mapped), with "link", "required_skills_list" and
+    "internship_id" materialized. The file is replaced atomically.
+    """
+    import pyarrow as pa
+    from pyarrow import feather
+
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    tmp_path = "%s.tmp-%d" % (path, os.getpid())
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_catalog(path=CATALOG_ARROW_PATH, mmap=True):
+    """
+    Loads a catalog written by write_catalog. With `mmap` the file is
+    memory-mapped and the columns are Arrow-backed (pd.ArrowDtype), so
+    nothing is parsed or copied up front. No normalization is needed.
+    """
+    import pyarrow as pa
+
+    source = pa.memory_map(path, "r") if mmap else pa.OSFile(path, "rb")
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def convert_catalog(csv_path=CATALOG_PATH, out_path=CATALOG_ARROW_PATH):
+    """
+    Converts the raw CSV catalog into the normalized Arrow IPC layout.
+    Returns the number of internships written.
+    """
+    catalog = load_catalog(csv_path)
+    write_catalog(catalog, out_path)
+    return len(catalog)
+
+
+def load_catalog(path=None):
+    """
+    Loads the normalized internships catalog.
+    `path` may be a CSV (parsed + normalized) or an .arrow file written by
+    write_catalog. By default the Arrow copy is used when pyarrow is
+    installed and it is at least as new as data/internships.csv.
+    Raises FileNotFoundError when the file does not exist.
+    """
+    if path is None:
+        path = CATALOG_PATH
+        if arrow_available() and os.path.exists(CATALOG_ARROW_PATH) and (
+            not os.path.exists(CATALOG_PATH)
+            or os.path.getmtime(CATALOG_ARROW_PATH) >= os.path.getmtime(CATALOG_PATH)
+        ):
+            path = CATALOG_ARROW_PATH
+    if not os.path.exists(path):
+        raise FileNotFoundError("Internships CSV not found.")
+    if path.endswith((".arrow", ".feather")):
+        return read_catalog(path)
+    return normalize_catalog(pd.read_csv(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Internship catalog tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert_cmd = sub.add_parser("convert", help="Convert the CSV catalog to a memory-mappable Arrow file")
+    convert_cmd.add_argument("--csv", default=CATALOG_PATH)
+    convert_cmd.add_argument("--out", default=CATALOG_ARROW_PATH)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        n_rows = convert_catalog(args.csv, args.out)
+        print(f"✅ Wrote {n_rows} internships to {args.out}")
@@ -0,0 +1,191 @@
+import threading
+import time
+
+# -------------------------------------------------------------
+# Pipeline metrics in the Prometheus text exposition format
+# -------------------------------------------------------------
+# Counters, gauges and histograms kept in process memory and rendered
+# by GET /metrics (format 0.0.4), so no client library or push gateway
+# is needed. Values are per process: with several gunicorn workers each
+# scrape sees the worker that answered it (scrape each worker, or sum
+# in the query over the `instance` label).
+#
+# process_resume times its numbered steps with a StageTimer:
+#   internify_stage_seconds{stage="pdf_to_text"} ...
+# -------------------------------------------------------------
+
+# Seconds; covers a cached hit (~1 ms) up to a slow multi-page PDF
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+
+
+class _Metric:
+    """
+    Base class: one named metric with a fixed tuple of label names and
+    one value (or value set) per label combination.
+    """
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError("%s expects labels %s, got %s" % (self.name, self.labels, sorted(labels)))
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{%s}" % ",".join('%s="%s"' % (name, _escape(value)) for name, value in pairs)
+
+    def render(self):
+        lines = ["# HELP %s %s" % (self.name, self.help_text), "# TYPE %s %s" % (self.name, self.kind)]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return ["%s%s %s" % (self.name, self._label_text(key), _number(value))]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram; each label combination keeps per-bucket
+    counts plus the running sum and count.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, key, state):
+        counts, total, count = state
+        lines = [
+            "%s_bucket%s %d" % (self.name, self._label_text(key, [("le", _number(bound))]), n)
+            for bound, n in zip(self.buckets, counts)
+        ]
+        lines.append("%s_bucket%s %d" % (self.name, self._label_text(key, [("le", "+Inf")]), count))
+        lines.append("%s_sum%s %s" % (self.name, self._label_text(key), _number(total)))
+        lines.append("%s_count%s %d" % (self.name, self._label_text(key), count))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them for a scrape.
+    """
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# -------------------------------------------------------------
+# Metrics of the matching path
+# -------------------------------------------------------------
+metrics = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = metrics.histogram(
+    "internify_stage_seconds", "Time spent in each process_resume stage.", ("stage",))
+RESUMES_PROCESSED = metrics.counter(
+    "internify_resumes_processed_total", "Resumes run through process_resume, by result cache outcome.",
+    ("cache",))
+PDF_PAGES = metrics.histogram(
+    "internify_pdf_pages", "Pages read per parsed resume PDF.", buckets=PAGE_BUCKETS)
+PDF_PAGES_READ = metrics.counter(
+    "internify_pdf_pages_read_total", "Resume PDF pages read.")
+CATALOG_SIZE = metrics.gauge(
+    "internify_catalog_internships", "Internships in the index serving requests.")
+
+
+class StageTimer:
+    """
+    Lap timer for one request: `lap(stage)` adds the time since the
+    previous lap (or creation) to `stage`. `finish()` observes every
+    stage, plus "total", once in STAGE_SECONDS. `timings` holds the
+    milliseconds per stage.
+    """
+    def __init__(self, histogram=STAGE_SECONDS):
+        self.histogram = histogram
+        self.seconds = {}
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(self):
+        self.seconds["total"] = time.perf_counter() - self._started
+        if self.histogram is not None:
+            for stage, elapsed in self.seconds.items():
+                self.histogram.observe(elapsed, stage=stage)
+
+    @property
+    def timings(self):
+        return {stage: round(elapsed * 1000.0, 3) for stage, elapsed in self.seconds.items()}
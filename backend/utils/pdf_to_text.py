@@ -1,25 +1,198 @@
-import PyPDF2  # Library for reading PDF files
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
+# -------------------------------------------------------------
+# PDF → text
+# -------------------------------------------------------------
+# Pluggable extraction backends: PyMuPDF (fast, C-based) first, PyPDF2
+# as a pure-Python fallback. Page and character caps keep a huge upload
+# from stalling a worker; long documents can optionally be split across
+# a process pool, page ranges per task. Ranges are submitted a few at a
+# time in page order, so the character cap stops the work early.
+# -------------------------------------------------------------
 
-def extract_text_from_pdf(pdf_path):
+PDF_BACKEND = os.getenv("INTERNIFY_PDF_BACKEND") or None              # "pymupdf" / "pypdf2"; None = first available
+MAX_PAGES = int(os.getenv("INTERNIFY_PDF_MAX_PAGES", "50"))          # pages read per document
+MAX_CHARS = int(os.getenv("INTERNIFY_PDF_MAX_CHARS", "200000"))      # characters kept per document
+PARALLEL_MIN_PAGES = int(os.getenv("INTERNIFY_PDF_PARALLEL_PAGES", "0"))  # 0 = page-parallel mode off
+PARALLEL_WORKERS = int(os.getenv("INTERNIFY_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARALLEL_TASKS_PER_WORKER = 2   # page ranges per worker; smaller ranges stop sooner at MAX_CHARS
+
+ExtractedPdf = namedtuple("ExtractedPdf", ["text", "pages", "total_pages", "truncated", "backend"])
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _import_pymupdf():
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf  # older PyMuPDF releases
+    return pymupdf
+
+
+def _read_bytes(source):
+    if hasattr(source, "read"):
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+        return data
+    with open(source, "rb") as file_handle:
+        return file_handle.read()
+
+
+def _pymupdf_page_range(data, start, stop):
     """
-    Reads a PDF file page by page and extracts all text.
-    Input  : pdf_path  → path of PDF file
-    Output : complete text string extracted from all pages
+    Extracts pages [start, stop) with PyMuPDF. Top-level so a process
+    pool can run it; each worker opens its own document.
+    """
+    pymupdf = _import_pymupdf()
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
 
-    Notes:
-    - This uses PyPDF2's text extraction; it works for digital PDFs.
-    - For scanned PDFs (images), integrate OCR (e.g., Tesseract).
+
+def _extract_pymupdf(source, max_pages, max_chars, parallel_min_pages):
+    pymupdf = _import_pymupdf()
+    data = _read_bytes(source)
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        total_pages = doc.page_count
+        n_pages = min(total_pages, max_pages)
+        if parallel_min_pages and n_pages >= parallel_min_pages and PARALLEL_WORKERS > 1:
+            return _extract_parallel(data, n_pages, max_chars), total_pages
+        parts, n_chars = [], 0
+        for i in range(n_pages):
+            page_text = doc[i].get_text()
+            parts.append(page_text)
+            n_chars += len(page_text)
+            if n_chars >= max_chars:
+                break
+        return parts, total_pages
+
+
+def _get_pool():
+    """
+    Returns the process-wide page pool, created once under a lock (the
+    server calls this from many threads). Workers are started with
+    forkserver (spawn where unavailable): forking a multithreaded
+    process can copy locks held by other threads into the child. The
+    fork server preloads only this module, not the server's __main__.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context("spawn")
+                _pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS, mp_context=context)
+    return _pool
+
+
+def _extract_parallel(data, n_pages, max_chars):
+    """
+    Extracts pages [0, n_pages) in ranges on the pool, at most
+    PARALLEL_WORKERS ranges in flight, consumed in page order. Like the
+    serial path, stops after the page that reaches `max_chars`; later
+    ranges are then never submitted.
     """
-    combined_text = ""
+    pool = _get_pool()
+    step = max(1, -(-n_pages // (PARALLEL_WORKERS * PARALLEL_TASKS_PER_WORKER)))  # ceil division
+    ranges = ((start, min(start + step, n_pages)) for start in range(0, n_pages, step))
+    pending = deque(
+        pool.submit(_pymupdf_page_range, data, start, stop)
+        for start, stop in itertools.islice(ranges, PARALLEL_WORKERS)
+    )
+    parts, n_chars = [], 0
+    while pending:
+        for page_text in pending.popleft().result():
+            parts.append(page_text)
+            n_chars += len(page_text)
+            if n_chars >= max_chars:
+                for future in pending:
+                    future.cancel()
+                return parts
+        for start, stop in itertools.islice(ranges, 1):
+            pending.append(pool.submit(_pymupdf_page_range, data, start, stop))
+    return parts
 
-    # Open the PDF file in binary read mode ('rb')
-    with open(pdf_path, "rb") as file_handle:
+
+def _extract_pypdf2(source, max_pages, max_chars, parallel_min_pages):
+    import PyPDF2  # Library for reading PDF files
+
+    def _read(file_handle):
         pdf_reader = PyPDF2.PdfReader(file_handle)
+        total_pages = len(pdf_reader.pages)
+        parts, n_chars = [], 0
+        for i in range(min(total_pages, max_pages)):
+            page_text = pdf_reader.pages[i].extract_text() or ""
+            parts.append(page_text)
+            n_chars += len(page_text)
+            if n_chars >= max_chars:
+                break
+        return parts, total_pages
+
+    if hasattr(source, "read"):
+        source.seek(0)
+        return _read(source)
+    with open(source, "rb") as file_handle:
+        return _read(file_handle)
+
+
+BACKENDS = {
+    "pymupdf": (_import_pymupdf, _extract_pymupdf),
+    "pypdf2": (lambda: __import__("PyPDF2"), _extract_pypdf2),
+}
 
-        # Loop through every page in the PDF
-        for page in pdf_reader.pages:
-            page_text = page.extract_text() or ""
-            combined_text += page_text
 
-    return combined_text
+def available_backend(preferred=None):
+    """
+    Returns the name of the backend to use: `preferred` (or PDF_BACKEND)
+    if given, otherwise the first importable one in BACKENDS order.
+    """
+    preferred = preferred or PDF_BACKEND
+    if preferred:
+        if preferred not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend {preferred!r}; choose from {list(BACKENDS)}")
+        return preferred
+    for name, (probe, _) in BACKENDS.items():
+        try:
+            probe()
+            return name
+        except ImportError:
+            continue
+    raise ImportError("No PDF backend installed (pip install PyMuPDF or PyPDF2)")
+
+
+def extract_pdf(source, backend=None, max_pages=MAX_PAGES, max_chars=MAX_CHARS, parallel_min_pages=PARALLEL_MIN_PAGES):
+    """
+    Extracts text from a PDF path or binary stream.
+    Returns ExtractedPdf(text, pages, total_pages, truncated, backend), where
+    `pages` is the number of pages read and `truncated` tells whether the
+    page or character cap cut the document short.
+    Pages are collected in a list and joined once (no repeated string +=).
+    """
+    name = available_backend(backend)
+    parts, total_pages = BACKENDS[name][1](source, max_pages, max_chars, parallel_min_pages)
+    text = "".join(parts)
+    truncated = len(parts) < total_pages or len(text) > max_chars
+    return ExtractedPdf(text[:max_chars], len(parts), total_pages, truncated, name)
+
+
+def extract_text_from_pdf(pdf_path, **options):
+    """
+    Reads a PDF file page by page and extracts all text.
+    Input  : pdf_path  → path of PDF file, or a binary file-like object
+    Output : complete text string extracted from all pages (up to the caps)
+
+    Notes:
+    - Uses PyMuPDF when installed, else PyPDF2; works for digital PDFs.
+    - For scanned PDFs (images), integrate OCR (e.g., Tesseract).
+    """
+    return extract_pdf(pdf_path, **options).text
@@ -0,0 +1,150 @@
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+
+# -------------------------------------------------------------
+# On-demand profiling of a single request
+# -------------------------------------------------------------
+# profile_call runs one function under cProfile and tracemalloc,
+# writes the artifacts under PROFILE_DIR keyed by request id:
+#   <request_id>.prof        cProfile stats (snakeviz, pstats)
+#   <request_id>.tracemalloc allocation snapshot (tracemalloc.Snapshot.load)
+#   <request_id>.json        the summary returned to the caller
+# and returns the top functions (cumulative time) and allocation sites.
+#
+# Nothing here runs unless a request asks for it: the API only checks a
+# header / query flag, and only admins (INTERNIFY_ADMIN_TOKEN) may set
+# it. Profiled calls are serialized, since tracemalloc traces the whole
+# process and only one profiler can be active at a time. Allocations
+# from concurrent unprofiled requests may still show up.
+# -------------------------------------------------------------
+
+PROFILE_DIR = os.getenv("INTERNIFY_PROFILE_DIR", "data/profiles")
+ADMIN_TOKEN = os.getenv("INTERNIFY_ADMIN_TOKEN") or None   # unset = profiling via the API is off
+PROFILE_TOP = 20           # functions / allocation sites in the summary
+TRACEMALLOC_FRAMES = 1     # frames kept per allocation (more = slower, finer tracebacks)
+
+_profile_lock = threading.Lock()
+
+
+def is_admin(token):
+    """
+    True when `token` matches INTERNIFY_ADMIN_TOKEN (constant-time compare).
+    """
+    return ADMIN_TOKEN is not None and token is not None and hmac.compare_digest(str(token), ADMIN_TOKEN)
+
+
+def safe_request_id(value=None):
+    """
+    Returns `value` reduced to [A-Za-z0-9_.-] (max 64 chars) for use as a
+    file name, or a new random id.
+    """
+    cleaned = re.sub(r"[^A-Za-z0-9_.-]", "", str(value or ""))[:64].lstrip(".")
+    return cleaned or uuid.uuid4().hex
+
+
+def profile_call(func, *args, request_id=None, directory=PROFILE_DIR, top=PROFILE_TOP, **kwargs):
+    """
+    Calls func(*args, **kwargs) under cProfile and tracemalloc and stores
+    the artifacts as `directory/<request_id>.*`. Returns (result, summary),
+    where summary holds request_id, wall_ms, peak_traced_kb, the artifact
+    paths, top_functions and top_allocations.
+    """
+    request_id = safe_request_id(request_id)
+    os.makedirs(directory, exist_ok=True)
+    paths = {ext: os.path.join(directory, "%s.%s" % (request_id, ext)) for ext in ("prof", "tracemalloc", "json")}
+
+    with _profile_lock:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    profiler.dump_stats(paths["prof"])
+    snapshot.dump(paths["tracemalloc"])
+    summary = {
+        "request_id": request_id,
+        "wall_ms": round(wall * 1000.0, 3),
+        "peak_traced_kb": round(peak / 1024.0, 1),
+        "profile_path": paths["prof"],
+        "allocations_path": paths["tracemalloc"],
+        "top_functions": top_functions(profiler, top),
+        "top_allocations": top_allocations(snapshot, top),
+    }
+    with open(paths["json"], "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return result, summary
+
+
+def top_functions(profiler, top=PROFILE_TOP):
+    """
+    The `top` functions by cumulative time: function, file:line, calls,
+    own time and cumulative time in ms.
+    """
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {
+            "function": name,
+            "location": "%s:%d" % (filename, line),
+            "calls": calls,
+            "own_ms": round(own * 1000.0, 3),
+            "cumulative_ms": round(cumulative * 1000.0, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+def top_allocations(snapshot, top=PROFILE_TOP):
+    """
+    The `top` source lines by memory still allocated when the call
+    returned (size in KiB and number of blocks).
+    """
+    return [
+        {
+            "location": "%s:%d" % (stat.traceback[0].filename, stat.traceback[0].lineno),
+            "size_kb": round(stat.size / 1024.0, 1),
+            "blocks": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
+
+
+def format_summary(summary):
+    """
+    Human-readable report of a profile_call summary (for the CLI).
+    """
+    lines = ["Profile %s: %.1f ms, peak traced %.1f KiB" % (
+        summary["request_id"], summary["wall_ms"], summary["peak_traced_kb"])]
+    lines.append("%12s %12s %9s  %s" % ("cumul ms", "own ms", "calls", "function"))
+    for row in summary["top_functions"]:
+        lines.append("%12.3f %12.3f %9d  %s (%s)" % (
+            row["cumulative_ms"], row["own_ms"], row["calls"], row["function"], row["location"]))
+    lines.append("%12s %9s  %s" % ("KiB", "blocks", "allocation site"))
+    for row in summary["top_allocations"]:
+        lines.append("%12.1f %9d  %s" % (row["size_kb"], row["blocks"], row["location"]))
+    lines.append("Artifacts: %s, %s" % (summary["profile_path"], summary["allocations_path"]))
+    return "\n".join(lines)
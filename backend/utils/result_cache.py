@@ -0,0 +1,82 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+
+# -------------------------------------------------------------
+# Result cache for the resume pipeline
+# -------------------------------------------------------------
+# Keys are derived from the SHA-256 of the uploaded bytes plus the
+# index/model versions, so a re-uploaded PDF skips text extraction,
+# vectorization and scoring. Entries live in an in-memory LRU; an
+# optional SQLite tier (db_handler.cache_get/cache_put) survives
+# restarts and is shared by all workers on the host.
+# -------------------------------------------------------------
+
+
+def content_hash(data, chunk_size=64 * 1024):
+    """
+    Returns the hex SHA-256 digest of raw uploaded bytes, or of a binary
+    stream (read in chunks, then rewound to position 0).
+    """
+    if not hasattr(data, "read"):
+        return hashlib.sha256(data).hexdigest()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: data.read(chunk_size), b""):
+        digest.update(chunk)
+    data.seek(0)
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """
+    Joins key parts (digest, versions, parameters) into one cache key.
+    """
+    return "|".join(str(p) for p in parts)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with an optional persistent second tier.
+    `store` must provide get(key) -> bytes|None and put(key, bytes).
+    """
+    def __init__(self, max_entries=256, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.store is None:
+            return None
+        payload = self.store.get(key)
+        if payload is None:
+            return None
+        value = pickle.loads(payload)
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.store is not None:
+            self.store.put(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _remember(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
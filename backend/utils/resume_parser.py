@@ -1,28 +1,21 @@
-import re
+from utils.skill_matcher import get_skill_matcher
 
 # -------------------------------------------------------------
-# Resume Parser (Simple Keyword Extraction)
+# Resume Parser (Skill Extraction)
 # -------------------------------------------------------------
-# This module extracts skills from a resume text using keyword
-# matching. Later, we can replace this with spaCy or transformer-based NER.
+# This module extracts skills from a resume text with the shared
+# single-pass skill matcher (utils/skill_matcher.py). Later, we can
+# add spaCy or transformer-based NER on top.
 # -------------------------------------------------------------
 
 def extract_skills(text):
     """
     Extracts relevant skills from a given resume text.
-    Strategy: keyword matching on a small curated list.
-    Limitations: does not handle synonyms/phrases robustly; consider spaCy/LLM later.
+    Strategy: one Aho–Corasick pass over the text against the skill
+    taxonomy (synonyms map to canonical names, word boundaries respected).
+    Returns unique canonical skills in order of first occurrence.
     """
-    skill_keywords = [
-        'python', 'java', 'c++', 'machine learning', 'deep learning',
-        'data analysis', 'excel', 'sql', 'tableau', 'pandas',
-        'flask', 'django', 'react', 'html', 'css', 'nlp', 'pytorch',
-        'tensorflow', 'transformers', 'analytics'
-    ]
-
-    text_lower = text.lower()
-    found_skills = [skill for skill in skill_keywords if skill in text_lower]
-    return list(set(found_skills))  # remove duplicates
+    return get_skill_matcher().extract(text)
 
 
 def parse_resume(text):
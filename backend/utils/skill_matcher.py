@@ -0,0 +1,190 @@
+import csv
+import os
+import threading
+from collections import deque, namedtuple
+
+# -------------------------------------------------------------
+# Skill Matcher (single-pass Aho–Corasick)
+# -------------------------------------------------------------
+# All skill names and synonyms are compiled into one automaton, so a
+# resume is scanned once regardless of taxonomy size. Matches must sit
+# on word boundaries ("java" does not fire inside "javascript", "css"
+# not inside "access") and whitespace runs in the text match a single
+# space in multi-word skills ("machine\nlearning").
+# -------------------------------------------------------------
+
+TAXONOMY_PATH = "data/skills.csv"  # Optional: columns skill,synonyms ("|"-separated)
+
+DEFAULT_SKILLS = [
+    'python', 'java', 'c++', 'machine learning', 'deep learning',
+    'data analysis', 'excel', 'sql', 'tableau', 'pandas',
+    'flask', 'django', 'react', 'html', 'css', 'nlp', 'pytorch',
+    'tensorflow', 'transformers', 'analytics', 'javascript',
+    'communication', 'teamwork'
+]
+
+DEFAULT_SYNONYMS = {
+    'machine learning': ['ml'],
+    'deep learning': ['dl'],
+    'javascript': ['js'],
+    'nlp': ['natural language processing'],
+    'excel': ['ms excel', 'microsoft excel'],
+    'react': ['react.js', 'reactjs'],
+    'c++': ['cpp'],
+    'teamwork': ['team work'],
+}
+
+SkillMatch = namedtuple("SkillMatch", ["skill", "start", "end"])
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _normalize(phrase):
+    return " ".join(phrase.lower().split())
+
+
+class SkillMatcher:
+    """
+    Compiled multi-pattern matcher mapping surface forms to canonical skills.
+    Build once (see get_skill_matcher) and reuse across requests.
+    """
+    def __init__(self, taxonomy):
+        """
+        taxonomy: dict of canonical skill → iterable of synonyms.
+        The canonical name itself is always matched too.
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.skills = []
+        for canonical, synonyms in taxonomy.items():
+            canonical = _normalize(canonical)
+            if not canonical:
+                continue
+            self.skills.append(canonical)
+            for surface in [canonical] + [_normalize(s) for s in synonyms or []]:
+                if surface:
+                    self._add(surface, canonical)
+        self._build_failure_links()
+
+    def _add(self, surface, canonical):
+        state = 0
+        for ch in surface:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        # (length, canonical, needs left boundary, needs right boundary)
+        self._out[state].append((len(surface), canonical, _is_word_char(surface[0]), _is_word_char(surface[-1])))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text):
+        """
+        Yields SkillMatch(skill, start, end) for every boundary-respecting
+        occurrence, with start/end offsets into the original text.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        origin = []        # original text offset of each normalized char
+        state = 0
+        prev_space = True  # collapse leading/repeated whitespace
+        for i, raw in enumerate(text):
+            if raw.isspace():
+                if prev_space:
+                    continue
+                prev_space = True
+                chars = " "
+            else:
+                prev_space = False
+                chars = raw.lower()
+            for ch in chars:
+                origin.append(i)
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                for length, canonical, left, right in out[state]:
+                    start = origin[len(origin) - length]
+                    end = i + 1
+                    if left and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if right and end < len(text) and _is_word_char(text[end]):
+                        continue
+                    yield SkillMatch(canonical, start, end)
+
+    def find(self, text):
+        """
+        Returns all matches as a list of SkillMatch tuples.
+        """
+        return list(self.finditer(text))
+
+    def extract(self, text):
+        """
+        Returns the unique canonical skills found, in order of first occurrence.
+        """
+        seen = {}
+        for match in self.finditer(text):
+            seen.setdefault(match.skill, None)
+        return list(seen)
+
+    def canonicalize(self, phrase):
+        """
+        Maps a single skill phrase (e.g. "ReactJS") to its canonical name
+        when the whole phrase is a known surface form, otherwise returns
+        the normalized phrase unchanged.
+        """
+        phrase = _normalize(phrase)
+        for match in self.finditer(phrase):
+            if match.start == 0 and match.end == len(phrase):
+                return match.skill
+        return phrase
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """
+    Returns the skill taxonomy as {canonical: [synonyms]}.
+    Built-in skills are always included; entries from `path` (if it
+    exists) extend them with additional skills and synonyms.
+    """
+    taxonomy = {skill: list(DEFAULT_SYNONYMS.get(skill, [])) for skill in DEFAULT_SKILLS}
+    if path and os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                skill = _normalize(row.get("skill") or "")
+                if not skill:
+                    continue
+                synonyms = [s for s in (row.get("synonyms") or "").split("|") if s.strip()]
+                taxonomy.setdefault(skill, []).extend(synonyms)
+    return taxonomy
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """
+    Returns the process-wide matcher, compiling the taxonomy on first use.
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_taxonomy())
+    return _matcher
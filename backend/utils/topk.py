@@ -0,0 +1,81 @@
+import numpy as np
+
+# -------------------------------------------------------------
+# Top-K selection over NumPy score arrays
+# -------------------------------------------------------------
+# argpartition picks the K best candidates in O(n); only those K are
+# sorted. Grouped variants (per cluster / per company) widen the
+# candidate pool geometrically instead of sorting the whole catalog.
+# -------------------------------------------------------------
+
+
+def top_k(scores, k):
+    """
+    Returns the indices of the `k` highest scores, best first.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def rank_within_groups(groups):
+    """
+    For a sequence of group labels, returns how many earlier entries share
+    each entry's label (0 for the first occurrence, 1 for the second, ...).
+    """
+    groups = np.asarray(groups)
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    positions = np.arange(groups.shape[0])
+    starts = np.ones(groups.shape[0], dtype=bool)
+    starts[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0))
+    ranks = np.empty_like(positions)
+    ranks[order] = positions - group_start
+    return ranks
+
+
+def top_k_per_group(scores, groups, k, per_group_k):
+    """
+    Returns up to `k` indices, best first, keeping at most `per_group_k`
+    entries from each group (e.g. cluster id or company name).
+    The candidate pool starts at 4*k and grows 4x until enough rows pass.
+    """
+    scores = np.asarray(scores)
+    groups = np.asarray(groups)
+    n = scores.shape[0]
+    k = min(int(k), n)
+    if k <= 0 or per_group_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    pool = min(n, 4 * k)
+    while True:
+        candidates = top_k(scores, pool)
+        kept = candidates[rank_within_groups(groups[candidates]) < per_group_k][:k]
+        if kept.shape[0] == k or pool == n:
+            return kept
+        pool = min(n, pool * 4)
+
+
+def top_k_rows(scores, k):
+    """
+    Row-wise top-k for a 2D score matrix (one row per query).
+    Returns an int array of shape (n_rows, min(k, n_cols)), best first.
+    """
+    scores = np.asarray(scores)
+    n_cols = scores.shape[1]
+    k = min(int(k), n_cols)
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    if k < n_cols:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(n_cols), (scores.shape[0], 1))
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
@@ -0,0 +1,64 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+# -------------------------------------------------------------
+# Upload handling
+# -------------------------------------------------------------
+# Resumes are processed from a seekable in-memory/spooled stream; nothing
+# is written to a shared uploads folder. When an upload store is
+# configured, the PDF is also kept under its SHA-256 (content-addressed),
+# so concurrent users can never overwrite each other's file.
+# -------------------------------------------------------------
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_MEMORY = 1024 * 1024   # larger uploads spill to a temp file
+
+
+class UploadTooLarge(ValueError):
+    """
+    Raised when an upload exceeds the configured size limit.
+    """
+
+
+def spool_upload(stream, max_bytes):
+    """
+    Returns (seekable_stream, size, sha256_hex) for an upload stream.
+    Seekable streams (werkzeug already spools form files) are hashed in
+    place; others are copied into a SpooledTemporaryFile. The returned
+    stream is rewound to position 0. Raises UploadTooLarge past max_bytes.
+    """
+    seekable = getattr(stream, "seekable", lambda: False)()
+    target = stream if seekable else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        digest.update(chunk)
+        if target is not stream:
+            target.write(chunk)
+    target.seek(0)
+    return target, size, digest.hexdigest()
+
+
+def store_upload(stream, digest, root):
+    """
+    Persists an upload as root/<aa>/<digest>.pdf (skipped if already
+    present) and rewinds the stream. Returns the stored path.
+    """
+    folder = os.path.join(root, digest[:2])
+    path = os.path.join(folder, digest + ".pdf")
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(stream, out, CHUNK_SIZE)
+        os.replace(tmp_path, path)
+    stream.seek(0)
+    return path
@@ -74,7 +74,9 @@ with st.sidebar:
             try:
                 r = requests.get(f"{API_BASE}/matches", params={"user_id": st.session_state["user_id"]}, timeout=10)
                 if r.status_code == 200:
-                    st.session_state["history"] = r.json()
+                    data = r.json()
+                    # Paginated backend returns {"matches": [...], "next_cursor": ...}
+                    st.session_state["history"] = data.get("matches", data) if isinstance(data, dict) else data
                     st.success("History loaded")
                 else:
                     try: